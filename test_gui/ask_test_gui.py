@@ -1,11 +1,200 @@
 import logging
 import typing
+from itertools import islice
 from PySide6 import QtWidgets, QtCore
 
 from main.lib.database import mainDB
+from main.scripts.gui.test_gui.test_cache import testCache
+from main.scripts.gui.test_gui.db_instrumentation import dbInstrumentation, ActionRecord
+from main.scripts.gui.test_gui.workers import Worker
+from main.scripts.gui.test_gui.local_snapshot import getOrderedTestList, getObjectTypes
+from main.scripts.gui.test_gui.usage_stats import usageStats
 
 from constants.versions import Version
-from configs import gui_config
+
+
+class TestListModel(QtCore.QAbstractListModel):
+    """Tests available in the picker, filterable by name.
+
+    The most used tests (see usage_stats) are shown right away, the ordered test list is
+    loaded in background then paged in after them. A checkable model keeps its checked
+    tests across filter changes, see checkedTestIds.
+    """
+
+    PAGE_SIZE = 100
+    TOP_TESTS = 10
+
+    testsLoaded = QtCore.Signal()
+
+    def __init__(self, parent: typing.Optional[QtCore.QObject] = None, checkable: bool = False) -> None:
+        super().__init__(parent)
+        self.checkable = checkable
+        self._checked: set[typing.Any] = set()
+        # remaining tests of the ordered list, None until it is loaded
+        self._source: typing.Optional[typing.Iterator[dict]] = None
+        self._exhausted = False
+        # fetched tests as (label, _id), and their lower case labels used as search index
+        self._tests: list[tuple[str, typing.Any]] = []
+        self._nameIndex: list[str] = []
+        # indexes in self._tests matching self._filter, None when no filter is set
+        self._filter = ""
+        self._rows: typing.Optional[list[int]] = None
+
+        for label, testId in usageStats.topTests(self.TOP_TESTS):
+            self._tests.append((label, testId))
+            self._nameIndex.append(label.lower())
+
+        self._loadAction = dbInstrumentation.beginAction("loadTestList")
+        self._loader = Worker(getOrderedTestList)
+        self._loader.signals.finished.connect(self.on_testListLoaded)
+        self._loader.signals.failed.connect(self.on_testListLoadFailed)
+        self._loader.start()
+
+    def isLoaded(self) -> bool:
+        return self._source is not None
+
+    def _label(self, testDict: dict) -> str:
+        return f"{testDict['name']} - {testDict['version']}"
+
+    def _append(self, testDicts: list[dict]):
+        for testDict in testDicts:
+            label = self._label(testDict)
+            self._tests.append((label, testDict["_id"]))
+            self._nameIndex.append(label.lower())
+
+    def on_testListLoaded(self, testList: list[dict]):
+        dbInstrumentation.endAction(self._loadAction)
+        self._loadAction = None
+        # tests shown from usage statistics get their current label, removed ones are dropped
+        shownIds = {testId for _, testId in self._tests}
+        labels = {}
+        remaining = []
+        for testDict in testList:
+            if testDict["_id"] in shownIds:
+                labels[testDict["_id"]] = self._label(testDict)
+            else:
+                remaining.append(testDict)
+        self._source = iter(remaining)
+        for testId in shownIds.difference(labels):
+            usageStats.forget(testId)
+
+        if self._rows is None:
+            for row in reversed(range(len(self._tests))):
+                label, testId = self._tests[row]
+                if testId not in labels:
+                    self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+                    del self._tests[row], self._nameIndex[row]
+                    self.endRemoveRows()
+                elif labels[testId] != label:
+                    self._tests[row] = (labels[testId], testId)
+                    self._nameIndex[row] = labels[testId].lower()
+                    self.dataChanged.emit(self.index(row), self.index(row))
+            self.fetchMore(QtCore.QModelIndex())
+        else:
+            self.beginResetModel()
+            self._tests = [(labels[testId], testId) for _, testId in self._tests if testId in labels]
+            self._nameIndex = [label.lower() for label, _ in self._tests]
+            self._rows = None
+            self.endResetModel()
+            # filtered again over every test
+            self.setFilterText(self._filter)
+        self.testsLoaded.emit()
+
+    def on_testListLoadFailed(self, error: Exception):
+        dbInstrumentation.endAction(self._loadAction)
+        self._loadAction = None
+        logging.error(f"Failed to load the test list: {error}")
+        self._source = iter([])
+        self._exhausted = True
+        self.testsLoaded.emit()
+
+    def _testIndex(self, row: int) -> int:
+        return row if self._rows is None else self._rows[row]
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._tests) if self._rows is None else len(self._rows)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole) -> typing.Any:
+        if not index.isValid() or not 0 <= index.row() < self.rowCount():
+            return None
+        label, testId = self._tests[self._testIndex(index.row())]
+        match role:
+            case QtCore.Qt.ItemDataRole.DisplayRole:
+                return label
+            case QtCore.Qt.ItemDataRole.UserRole:
+                return testId
+            case QtCore.Qt.ItemDataRole.CheckStateRole if self.checkable:
+                return QtCore.Qt.CheckState.Checked if testId in self._checked else QtCore.Qt.CheckState.Unchecked
+        return None
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlag:
+        flags = super().flags(index)
+        if self.checkable and index.isValid():
+            flags |= QtCore.Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def setData(self, index: QtCore.QModelIndex, value: typing.Any, role: int = QtCore.Qt.ItemDataRole.EditRole) -> bool:
+        if not self.checkable or role != QtCore.Qt.ItemDataRole.CheckStateRole or not index.isValid():
+            return False
+        _, testId = self._tests[self._testIndex(index.row())]
+        if QtCore.Qt.CheckState(value) == QtCore.Qt.CheckState.Checked:
+            self._checked.add(testId)
+        else:
+            self._checked.discard(testId)
+        self.dataChanged.emit(index, index, [QtCore.Qt.ItemDataRole.CheckStateRole])
+        return True
+
+    def setAllChecked(self, checked: bool):
+        """(Un)check every test currently shown."""
+        testIds = {self._tests[self._testIndex(row)][1] for row in range(self.rowCount())}
+        if checked:
+            self._checked.update(testIds)
+        else:
+            self._checked.difference_update(testIds)
+        if self.rowCount() > 0:
+            self.dataChanged.emit(
+                self.index(0), self.index(self.rowCount() - 1), [QtCore.Qt.ItemDataRole.CheckStateRole]
+            )
+
+    def checkedTestIds(self) -> list[typing.Any]:
+        return [testId for _, testId in self._tests if testId in self._checked]
+
+    def canFetchMore(self, parent: QtCore.QModelIndex) -> bool:
+        # a filtered model already holds every test, see setFilterText
+        return not parent.isValid() and self._source is not None and not self._exhausted and self._rows is None
+
+    def fetchMore(self, parent: QtCore.QModelIndex):
+        if not self.canFetchMore(parent):
+            return
+        page = list(islice(self._source, self.PAGE_SIZE))
+        if len(page) < self.PAGE_SIZE:
+            self._exhausted = True
+        if page:
+            first = len(self._tests)
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(page) - 1)
+            self._append(page)
+            self.endInsertRows()
+
+    def setFilterText(self, text: str):
+        """Only show tests whose label contains text (case insensitive)."""
+        text = text.strip().lower()
+        self.beginResetModel()
+        if not text:
+            self._rows = None
+        else:
+            if self._source is not None and not self._exhausted:
+                self._append(list(self._source))
+                self._exhausted = True
+            # typing more characters narrows the previous result instead of rescanning everything
+            if self._rows is not None and text.startswith(self._filter):
+                candidates = self._rows
+            else:
+                candidates = range(len(self._tests))
+            self._rows = [i for i in candidates if text in self._nameIndex[i]]
+        self._filter = text
+        self.endResetModel()
 
 
 class AskTestDialog(QtWidgets.QDialog):
@@ -19,9 +208,16 @@ class AskTestDialog(QtWidgets.QDialog):
         self.IS_READ_ONLY = mainDB.IS_READ_ONLY
 
         self.mainLayout.addWidget(QtWidgets.QLabel("Select a test:"))
+        self.searchLE = QtWidgets.QLineEdit(self)
+        self.searchLE.setPlaceholderText("Type to filter tests...")
+        self.searchLE.setClearButtonEnabled(True)
+        self.searchLE.textChanged.connect(self.on_searchTextChanged)
+        self.mainLayout.addWidget(self.searchLE)
+
+        self.testListModel = TestListModel(self)
+        self.testListModel.testsLoaded.connect(self.on_testsLoaded)
         self.testCoB = QtWidgets.QComboBox(self)
-        for testDict in mainDB.tests.getOrderedList(gui_config.MOST_USED_TEST):
-            self.testCoB.addItem(f"{testDict['name']} - {testDict['version']}", testDict["_id"])
+        self.testCoB.setModel(self.testListModel)
         self.mainLayout.addWidget(self.testCoB)
 
         self.selectPB = QtWidgets.QPushButton(text="Select")
@@ -36,33 +232,162 @@ class AskTestDialog(QtWidgets.QDialog):
         self.createPB.clicked.connect(self.on_createPBClicked)
         self.mainLayout.addWidget(self.createPB)
 
+        self.bulkEditPB = QtWidgets.QPushButton(text="Bulk Edit...")
+        self.bulkEditPB.clicked.connect(self.on_bulkEditPBClicked)
+        self.mainLayout.addWidget(self.bulkEditPB)
+
         self.selectedTestId = None
 
+        # background duplication, see startDuplication
+        self._duplicateWorker: Worker = None
+        self._duplicateLabel: str = None
+        # cancelled workers are kept alive until they complete, with the label of the duplicated test
+        self._cancelledWorkers: list[tuple[Worker, str]] = []
+        self._duplicateAction: ActionRecord = None
+        self.duplicateProgress: QtWidgets.QProgressDialog = None
+        self._duplicateElapsed = QtCore.QElapsedTimer()
+        self._duplicateProgressTimer = QtCore.QTimer(self)
+        self._duplicateProgressTimer.setInterval(1000)
+        self._duplicateProgressTimer.timeout.connect(self.on_duplicateProgressTimeout)
+
         if self.IS_READ_ONLY:
             self.createPB.setDisabled(True)
             self.duplicatePB.setDisabled(True)
+            self.bulkEditPB.setDisabled(True)
+        self.updateTestButtons()
+
+    def updateTestButtons(self):
+        # disabled while a duplication is in progress
+        hasTests = self.testCoB.currentIndex() >= 0 and self._duplicateWorker is None
+        self.selectPB.setEnabled(hasTests)
+        self.duplicatePB.setEnabled(hasTests and not self.IS_READ_ONLY)
+
+    def setActionsEnabled(self, enabled: bool):
+        for widget in [self.searchLE, self.testCoB]:
+            widget.setEnabled(enabled)
+        for widget in [self.createPB, self.bulkEditPB]:
+            widget.setEnabled(enabled and not self.IS_READ_ONLY)
+        if enabled:
+            self.updateTestButtons()
+        else:
+            self.selectPB.setEnabled(False)
+            self.duplicatePB.setEnabled(False)
+
+    def startDuplication(self, testId, testLabel: str):
+        """Duplicate the test in background, the dialog stays responsive and shows progress."""
+        self.setActionsEnabled(False)
+        self._duplicateAction = dbInstrumentation.beginAction("on_duplicatePBClicked")
+
+        self.duplicateProgress = QtWidgets.QProgressDialog(f"Duplicating {testLabel}...", "Cancel", 0, 0, self)
+        self.duplicateProgress.setWindowTitle("Duplicate Test")
+        self.duplicateProgress.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+        self.duplicateProgress.setMinimumDuration(0)
+        self.duplicateProgress.canceled.connect(self.on_duplicateCanceled)
+        self._duplicateElapsed.start()
+        self._duplicateProgressTimer.start()
+
+        self._duplicateLabel = testLabel
+        self._duplicateWorker = Worker(testCache.duplicateFrom, testId)
+        self._duplicateWorker.signals.finished.connect(self.on_duplicateFinished)
+        self._duplicateWorker.signals.failed.connect(self.on_duplicateFailed)
+        self._duplicateWorker.start()
+        self.duplicateProgress.show()
+
+    def _endDuplication(self):
+        self._duplicateProgressTimer.stop()
+        if self.duplicateProgress is not None:
+            self.duplicateProgress.canceled.disconnect(self.on_duplicateCanceled)
+            self.duplicateProgress.close()
+            self.duplicateProgress = None
+        if self._duplicateAction is not None:
+            dbInstrumentation.endAction(self._duplicateAction)
+            self._duplicateAction = None
+        self._duplicateWorker = None
+        self.setActionsEnabled(True)
 
     # ------------------------------ CALLBACKS ------------------------------ #
+    def on_searchTextChanged(self, text: str):
+        self.testListModel.setFilterText(text)
+        self.testCoB.setCurrentIndex(0 if self.testListModel.rowCount() > 0 else -1)
+        self.updateTestButtons()
+
+    def on_testsLoaded(self):
+        if self.testCoB.currentIndex() < 0 and self.testListModel.rowCount() > 0:
+            self.testCoB.setCurrentIndex(0)
+        self.updateTestButtons()
+
     def on_duplicatePBClicked(self):
         selectedTestId = self.testCoB.currentData(QtCore.Qt.ItemDataRole.UserRole)
-        test = mainDB.tests.get(
-            id=selectedTestId, projection={"objectType": True, "name": True, "version": True})[0]
+        # "name - version", no need to fetch the test
+        testLabel = self.testCoB.currentText()
         userResponse = QtWidgets.QMessageBox.question(
             self,
             "Duplicate Test",
-            f"Create a new test duplicated from {test} ?",
+            f"Create a new test duplicated from {testLabel} ?",
             QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
         )
         if userResponse == QtWidgets.QMessageBox.Yes:
-            self.selectedTestId = mainDB.tests.duplicateFrom(testId=selectedTestId)
-            self.accept()
+            self.startDuplication(selectedTestId, testLabel)
+
+    def on_duplicateProgressTimeout(self):
+        if self.duplicateProgress is not None:
+            label = self.duplicateProgress.labelText().split(" (")[0]
+            self.duplicateProgress.setLabelText(f"{label} ({self._duplicateElapsed.elapsed() // 1000} s)")
+
+    def on_duplicateCanceled(self):
+        # the database copy cannot be interrupted (nor removed), the user is told once it completes
+        logging.info("Test duplication cancelled, the new test will not be opened.")
+        self._cancelledWorkers.append((self._duplicateWorker, self._duplicateLabel))
+        self._endDuplication()
+
+    def _cancelledDuplication(self) -> str:
+        """Label of the test whose cancelled duplication is reporting, None if not cancelled."""
+        for worker, testLabel in self._cancelledWorkers:
+            if self.sender() is worker.signals:
+                self._cancelledWorkers.remove((worker, testLabel))
+                return testLabel
+        return None
+
+    def on_duplicateFinished(self, newTestId):
+        if (testLabel := self._cancelledDuplication()) is not None:
+            logging.warning(f"Cancelled duplication of {testLabel} completed anyway as test {newTestId}.")
+            if not self.isVisible():
+                return
+            userResponse = QtWidgets.QMessageBox.question(
+                self,
+                "Duplicate Test",
+                f"The duplication could not be interrupted: a copy of {testLabel} was created anyway.\n"
+                "Open it?",
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+            )
+            if userResponse == QtWidgets.QMessageBox.Yes:
+                self.selectedTestId = newTestId
+                self.accept()
+            return
+        self._endDuplication()
+        self.selectedTestId = newTestId
+        self.accept()
+
+    def on_duplicateFailed(self, error: Exception):
+        if self._cancelledDuplication() is not None:
+            logging.error(f"Cancelled test duplication failed: {error}")
+            return
+        self._endDuplication()
+        logging.error(f"Test duplication failed: {error}")
+        QtWidgets.QMessageBox.warning(self, "Failed", "Test not duplicated. Please check log.")
+
+    def on_bulkEditPBClicked(self):
+        # only imported on first use
+        from main.scripts.gui.test_gui.bulk_edit import BulkEditDialog
+
+        BulkEditDialog(self).exec()
 
     def on_selectPBClicked(self):
         self.selectedTestId = self.testCoB.currentData(QtCore.Qt.ItemDataRole.UserRole)
         self.accept()
 
     def on_createPBClicked(self):
-        objectTypes = mainDB.objects.OBJECT_TYPE_LIST
+        objectTypes = getObjectTypes()
         objectType, ok = QtWidgets.QInputDialog.getItem(
             self, "Select object type", "Object type:", objectTypes, 0, False
         )
@@ -78,16 +403,17 @@ class AskTestDialog(QtWidgets.QDialog):
                         except ValueError:
                             logging.error("Please enter a valid version (e.g., 1.0)")
 
-                existingTest = mainDB.tests.get(name=testName, version=Version(versionMajor, versionMinor))
-                if existingTest:
-                    logging.error("A test with same name and version already exists")
-                else:
-                    self.selectedTestId = mainDB.tests.create(
-                        objectType=objectType,
-                        name=testName,
-                        version=Version(versionMajor, versionMinor),
-                        stageDescriptionIdList=[],
-                        winDescriptionIdList=[],
-                        scoreDescriptionIdList=[],
-                    )
-                    self.accept()
+                with dbInstrumentation.action("on_createPBClicked"):
+                    existingTest = mainDB.tests.get(name=testName, version=Version(versionMajor, versionMinor))
+                    if existingTest:
+                        logging.error("A test with same name and version already exists")
+                    else:
+                        self.selectedTestId = testCache.create(
+                            objectType=objectType,
+                            name=testName,
+                            version=Version(versionMajor, versionMinor),
+                            stageDescriptionIdList=[],
+                            winDescriptionIdList=[],
+                            scoreDescriptionIdList=[],
+                        )
+                        self.accept()
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import logging
+import typing
+from copy import deepcopy
+from typing import Any, NamedTuple
+
+from bson import ObjectId
+from PySide6 import QtWidgets
+
+from main.lib.misc import utils
+from main.lib.database import mainDB
+from main.scripts.gui.test_gui.test_cache import testCache
+from main.scripts.gui.test_gui.db_instrumentation import dbInstrumentation, ActionRecord
+from main.scripts.gui.test_gui.workers import Worker
+from main.scripts.gui.test_gui.local_snapshot import getObjectTypes
+from main.scripts.gui.test_gui.ask_test_gui import TestListModel
+
+# label -> mapKeyList, same key paths as TestWindow.WIDGET_DATABASE_MAPKEYLISTS_MAPPING
+BULK_EDIT_FIELDS = {
+    "Active": ["active"],
+    "Object type": ["objectType"],
+}
+
+
+def fieldChoices(mapKeyList: list[str]) -> list[tuple[str, Any]]:
+    """(label, value) choices offered for a bulk edited field."""
+    match mapKeyList:
+        case ["active"]:
+            return [("Active", True), ("Inactive", False)]
+        case ["objectType"]:
+            return [(objectType, objectType) for objectType in getObjectTypes()]
+        case _:
+            raise NotImplementedError
+
+
+class BulkEditChange(NamedTuple):
+    testId: ObjectId
+    label: str
+    oldValue: Any
+    newValue: Any
+    # partial update sent on apply, top level key -> value
+    updateDict: dict
+
+    @property
+    def changed(self) -> bool:
+        return self.oldValue != self.newValue
+
+
+class BulkEdit:
+    """Set the value at mapKeyList for several tests.
+
+    preview is a dry run: a single projected query, restricted to the tests, gives their
+    current value. apply only sends a partial update for the tests whose value actually
+    changes, one per test as mainDB has no multi-document update (a failing test does not
+    stop the others).
+    """
+
+    def __init__(self, testIds: list[ObjectId], mapKeyList: list[str], value: Any) -> None:
+        self.testIds = testIds
+        self.mapKeyList = mapKeyList
+        self.value = value
+
+    def preview(self) -> list[BulkEditChange]:
+        key = self.mapKeyList[0]
+        tests = {
+            test["_id"]: test
+            for test in mainDB.tests.get(
+                projection={"name": True, "version": True, key: True}, _id={"$in": list(self.testIds)}
+            )
+        }
+        changes = []
+        for testId in self.testIds:
+            if (test := tests.get(testId)) is None:
+                logging.warning(f"Test {testId} not found, skipped from bulk edit")
+                continue
+            try:
+                oldValue = utils.getFromDict(test, self.mapKeyList)
+            except KeyError:
+                oldValue = None
+            # the whole top level value is sent, as done by TestModel.saveData
+            updateDict = {key: deepcopy(test.get(key))}
+            utils.setInDict(updateDict, self.mapKeyList, self.value)
+            changes.append(
+                BulkEditChange(testId, f"{test['name']} - {test['version']}", oldValue, self.value, updateDict)
+            )
+        return changes
+
+    def apply(self, changes: list[BulkEditChange]) -> list[ObjectId]:
+        """Send the changed tests updates, return the ids of the tests that failed."""
+        failed = []
+        for change in changes:
+            if not change.changed:
+                continue
+            try:
+                updated = testCache.update(change.testId, change.updateDict)
+            except Exception as e:
+                logging.error(f"Bulk edit of test {change.label} failed: {e}")
+                updated = False
+            if not updated:
+                failed.append(change.testId)
+        return failed
+
+
+class BulkEditDialog(QtWidgets.QDialog):
+    """Check tests, choose a field and its new value, preview the changes then apply them."""
+
+    def __init__(self, parent: typing.Optional[QtWidgets.QWidget]) -> None:
+        super().__init__(parent=parent)
+        self.setWindowTitle("Bulk Edit Tests")
+        self.mainLayout = QtWidgets.QVBoxLayout()
+        self.setLayout(self.mainLayout)
+
+        self.searchLE = QtWidgets.QLineEdit(self)
+        self.searchLE.setPlaceholderText("Type to filter tests...")
+        self.searchLE.setClearButtonEnabled(True)
+        self.searchLE.textChanged.connect(self.on_searchTextChanged)
+        self.mainLayout.addWidget(self.searchLE)
+
+        self.testListModel = TestListModel(self, checkable=True)
+        self.testListModel.dataChanged.connect(self.on_editChanged)
+        self.testLV = QtWidgets.QListView(self)
+        self.testLV.setUniformItemSizes(True)
+        self.testLV.setModel(self.testListModel)
+        self.mainLayout.addWidget(self.testLV)
+
+        checkLayout = QtWidgets.QHBoxLayout()
+        self.checkAllPB = QtWidgets.QPushButton(text="Check Shown")
+        self.checkAllPB.clicked.connect(lambda: self.testListModel.setAllChecked(True))
+        checkLayout.addWidget(self.checkAllPB)
+        self.uncheckAllPB = QtWidgets.QPushButton(text="Uncheck Shown")
+        self.uncheckAllPB.clicked.connect(lambda: self.testListModel.setAllChecked(False))
+        checkLayout.addWidget(self.uncheckAllPB)
+        self.mainLayout.addLayout(checkLayout)
+
+        fieldLayout = QtWidgets.QFormLayout()
+        self.fieldCoB = QtWidgets.QComboBox(self)
+        for label, mapKeyList in BULK_EDIT_FIELDS.items():
+            self.fieldCoB.addItem(label, mapKeyList)
+        self.fieldCoB.currentIndexChanged.connect(self.on_fieldChanged)
+        fieldLayout.addRow("Field:", self.fieldCoB)
+        self.valueCoB = QtWidgets.QComboBox(self)
+        self.valueCoB.currentIndexChanged.connect(self.on_editChanged)
+        fieldLayout.addRow("New value:", self.valueCoB)
+        self.mainLayout.addLayout(fieldLayout)
+
+        self.previewPB = QtWidgets.QPushButton(text="Preview")
+        self.previewPB.clicked.connect(self.on_previewPBClicked)
+        self.mainLayout.addWidget(self.previewPB)
+        self.previewTE = QtWidgets.QPlainTextEdit(self)
+        self.previewTE.setReadOnly(True)
+        self.previewTE.setPlaceholderText("Preview the changes before applying them.")
+        self.mainLayout.addWidget(self.previewTE)
+        self.applyPB = QtWidgets.QPushButton(text="Apply")
+        self.applyPB.clicked.connect(self.on_applyPBClicked)
+        self.mainLayout.addWidget(self.applyPB)
+
+        self.changes: list[BulkEditChange] = []
+        self._applyWorker: Worker = None
+        self._applyAction: ActionRecord = None
+        self.on_fieldChanged()
+
+    def bulkEdit(self) -> BulkEdit:
+        return BulkEdit(self.testListModel.checkedTestIds(), self.fieldCoB.currentData(), self.valueCoB.currentData())
+
+    # ------------------------------ CALLBACKS ------------------------------ #
+    def on_searchTextChanged(self, text: str):
+        self.testListModel.setFilterText(text)
+
+    def on_fieldChanged(self):
+        self.valueCoB.blockSignals(True)
+        self.valueCoB.clear()
+        for label, value in fieldChoices(self.fieldCoB.currentData()):
+            self.valueCoB.addItem(label, value)
+        self.valueCoB.blockSignals(False)
+        self.on_editChanged()
+
+    def on_editChanged(self):
+        # a new preview is required before applying
+        self.changes = []
+        self.previewTE.clear()
+        self.previewPB.setEnabled(len(self.testListModel.checkedTestIds()) > 0)
+        self.applyPB.setEnabled(False)
+
+    def on_previewPBClicked(self):
+        with dbInstrumentation.action("on_previewPBClicked"):
+            self.changes = self.bulkEdit().preview()
+        nbChanged = sum(change.changed for change in self.changes)
+        lines = [f"{nbChanged} of {len(self.changes)} tests will be updated:"]
+        for change in self.changes:
+            status = f"{change.oldValue} -> {change.newValue}" if change.changed else "unchanged"
+            lines.append(f"{change.label}: {status}")
+        self.previewTE.setPlainText("\n".join(lines))
+        self.applyPB.setEnabled(nbChanged > 0)
+
+    def on_applyPBClicked(self):
+        for widget in [self.previewPB, self.applyPB, self.fieldCoB, self.valueCoB, self.testLV]:
+            widget.setEnabled(False)
+        self.previewTE.appendPlainText("Applying...")
+        self._applyAction = dbInstrumentation.beginAction("on_applyPBClicked")
+        self._applyWorker = Worker(self.bulkEdit().apply, self.changes)
+        self._applyWorker.signals.finished.connect(self.on_applyFinished)
+        self._applyWorker.signals.failed.connect(self.on_applyFailed)
+        self._applyWorker.start()
+
+    def _endApply(self):
+        dbInstrumentation.endAction(self._applyAction)
+        self._applyAction = None
+        self._applyWorker = None
+        for widget in [self.fieldCoB, self.valueCoB, self.testLV]:
+            widget.setEnabled(True)
+        self.on_editChanged()
+
+    def on_applyFinished(self, failed: list[ObjectId]):
+        nbChanged = sum(change.changed for change in self.changes)
+        self._endApply()
+        if failed:
+            QtWidgets.QMessageBox.warning(
+                self, "Failed", f"{len(failed)} of {nbChanged} tests not updated. Please check log."
+            )
+        else:
+            QtWidgets.QMessageBox.information(self, "Bulk Edit", f"{nbChanged} tests updated.")
+
+    def on_applyFailed(self, error: Exception):
+        self._endApply()
+        logging.error(f"Bulk edit failed: {error}")
+        QtWidgets.QMessageBox.warning(self, "Failed", "Tests not updated. Please check log.")
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import json
+import bisect
+import logging
+import threading
+import functools
+import statistics
+from time import perf_counter
+from collections import deque, defaultdict
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+import bson
+from bson.errors import InvalidDocument
+from bson.codec_options import CodecOptions, TypeRegistry
+from PySide6 import QtCore
+
+from main.lib.database import mainDB
+
+INSTRUMENTED_COLLECTIONS = ["tests", "windescriptions", "objects"]
+NO_ACTION = "(no action)"
+
+
+def _encodeFallback(value: Any) -> Any:
+    # Version and other application types, sized as stored
+    return value.toDict() if hasattr(value, "toDict") else str(value)
+
+
+PAYLOAD_CODEC_OPTIONS = CodecOptions(type_registry=TypeRegistry(fallback_encoder=_encodeFallback))
+
+
+class _InstrumentedCollection:
+    """Proxy of a mainDB collection, every public method call is recorded by the instrumentation."""
+
+    def __init__(self, name: str, collection: Any, instrumentation: DbInstrumentation) -> None:
+        self._name = name
+        self._collection = collection
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self._collection, attr)
+        if attr.startswith("_") or not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def _instrumented(*args, **kwargs):
+            start = perf_counter()
+            result = None
+            try:
+                result = value(*args, **kwargs)
+                return result
+            finally:
+                self._instrumentation.recordCall(f"{self._name}.{attr}", start, perf_counter(), (args, kwargs, result))
+
+        return _instrumented
+
+
+class ActionRecord:
+    __slots__ = ("name", "threadId", "start", "end", "nbCalls", "dbTime", "payloadSize")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.threadId = threading.get_ident()
+        self.start = perf_counter()
+        self.end: float = None
+        self.nbCalls = 0
+        self.dbTime = 0.0
+        self.payloadSize = 0
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else perf_counter()) - self.start
+
+    def summary(self) -> str:
+        summary = f"{self.name}: {self.nbCalls} queries, {self.dbTime * 1000:.0f} ms in DB / {self.duration * 1000:.0f} ms"
+        if self.payloadSize:
+            summary += f", {self.payloadSize / 1024:.1f} kB"
+        return summary
+
+
+class DbInstrumentation(QtCore.QObject):
+    """Count, time and size mainDB calls, attributed to the GUI action in progress.
+
+    Actions are tracked per thread, a Worker carries the action in progress where it was
+    created (see attach). Payload sizes cost a BSON encoding of each call, they are only
+    measured when measurePayload is set.
+
+    Keeps the last HISTORY_SIZE durations of each action for its histogram and the last
+    TRACE_SIZE events for a trace-event file (chrome://tracing, Perfetto).
+    """
+
+    summaryChanged = QtCore.Signal(str)
+
+    HISTORY_SIZE = 200
+    TRACE_SIZE = 20000
+    # upper bounds of the histogram buckets, in ms
+    HISTOGRAM_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+    def __init__(self, measurePayload: bool = False) -> None:
+        super().__init__()
+        self.measurePayload = measurePayload
+        # calls are made from the GUI thread and from loading workers
+        self._lock = threading.Lock()
+        # thread id -> actions in progress in that thread, most recent last
+        self._actions: defaultdict[int, list[ActionRecord]] = defaultdict(list)
+        self._history: defaultdict[str, deque[float]] = defaultdict(lambda: deque(maxlen=self.HISTORY_SIZE))
+        self._trace: deque[dict] = deque(maxlen=self.TRACE_SIZE)
+        self._origin = perf_counter()
+
+    def install(self):
+        """Replace the instrumented mainDB collections by recording proxies (idempotent)."""
+        for name in INSTRUMENTED_COLLECTIONS:
+            collection = getattr(mainDB, name)
+            if not isinstance(collection, _InstrumentedCollection):
+                setattr(mainDB, name, _InstrumentedCollection(name, collection, self))
+
+    def uninstall(self):
+        for name in INSTRUMENTED_COLLECTIONS:
+            collection = getattr(mainDB, name)
+            if isinstance(collection, _InstrumentedCollection):
+                setattr(mainDB, name, collection._collection)
+
+    # ------------------------------ ACTIONS ------------------------------ #
+
+    def beginAction(self, name: str) -> ActionRecord:
+        """Start attributing calls to name, until endAction (for actions spanning several callbacks)."""
+        action = ActionRecord(name)
+        with self._lock:
+            self._actions[action.threadId].append(action)
+        return action
+
+    def endAction(self, action: ActionRecord):
+        action.end = perf_counter()
+        with self._lock:
+            if action in (actions := self._actions.get(action.threadId, [])):
+                actions.remove(action)
+                if not actions:
+                    del self._actions[action.threadId]
+            self._history[action.name].append(action.duration)
+            self._trace.append(self._traceEvent(action.name, "action", action.start, action.end, {
+                "queries": action.nbCalls, "dbMs": action.dbTime * 1000, "bytes": action.payloadSize}))
+        self.summaryChanged.emit(f"{action.summary()} {self._percentiles(action.name)}")
+
+    @contextmanager
+    def action(self, name: str) -> Iterator[ActionRecord]:
+        action = self.beginAction(name)
+        try:
+            yield action
+        finally:
+            self.endAction(action)
+
+    def currentAction(self) -> Optional[ActionRecord]:
+        """Action in progress in the calling thread."""
+        with self._lock:
+            actions = self._actions.get(threading.get_ident())
+            return actions[-1] if actions else None
+
+    @contextmanager
+    def attach(self, action: Optional[ActionRecord]) -> Iterator[None]:
+        """Attribute the calls made by the calling thread to action, begun in another thread."""
+        if action is None:
+            yield
+            return
+        threadId = threading.get_ident()
+        with self._lock:
+            self._actions[threadId].append(action)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._actions[threadId].remove(action)
+                if not self._actions[threadId]:
+                    del self._actions[threadId]
+
+    # ------------------------------ CALLS ------------------------------ #
+
+    def _payloadSize(self, payload: Any) -> int:
+        match payload:
+            case dict():
+                try:
+                    return len(bson.encode(payload, codec_options=PAYLOAD_CODEC_OPTIONS))
+                except (InvalidDocument, TypeError, ValueError):
+                    return 0
+            case list() | tuple():
+                return sum(self._payloadSize(_) for _ in payload)
+        return 0
+
+    def recordCall(self, method: str, start: float, end: float, payload: Any):
+        size = self._payloadSize(payload) if self.measurePayload else 0
+        with self._lock:
+            # the most recent action of this thread is the one in progress
+            actions = self._actions.get(threading.get_ident())
+            action = actions[-1] if actions else None
+            if action is not None:
+                action.nbCalls += 1
+                action.dbTime += end - start
+                action.payloadSize += size
+            self._trace.append(self._traceEvent(method, "db", start, end, {
+                "action": action.name if action is not None else NO_ACTION, "bytes": size}))
+        logging.debug(f"{method} took {(end - start) * 1000:.1f} ms ({size} bytes)")
+        if action is not None:
+            self.summaryChanged.emit(action.summary())
+
+    # ------------------------------ REPORTS ------------------------------ #
+
+    def _traceEvent(self, name: str, category: str, start: float, end: float, args: dict) -> dict:
+        return {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": 0,
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+
+    def _percentiles(self, name: str) -> str:
+        durations = list(self._history[name])
+        if len(durations) < 2:
+            return ""
+        quantiles = statistics.quantiles(durations, n=20)
+        return f"(p50 {statistics.median(durations) * 1000:.0f} ms, p95 {quantiles[-1] * 1000:.0f} ms)"
+
+    def histogram(self, name: str) -> dict[str, int]:
+        """Number of the last runs of action name per duration bucket."""
+        labels = [f"<{bound} ms" for bound in self.HISTOGRAM_BUCKETS] + [f">={self.HISTOGRAM_BUCKETS[-1]} ms"]
+        counts = [0] * len(labels)
+        with self._lock:
+            durations = list(self._history.get(name, []))
+        for duration in durations:
+            counts[bisect.bisect_right(self.HISTOGRAM_BUCKETS, duration * 1000)] += 1
+        return dict(zip(labels, counts))
+
+    def dumpTrace(self, filePath: str):
+        """Write the recorded actions and calls as a trace-event JSON file."""
+        with self._lock:
+            events = list(self._trace)
+        histograms = {name: self.histogram(name) for name in list(self._history)}
+        with open(filePath, "w") as file:
+            json.dump({"traceEvents": events, "otherData": {"histograms": histograms}}, file)
+
+
+dbInstrumentation = DbInstrumentation()
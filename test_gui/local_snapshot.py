@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path, PurePath
+from typing import Any, Optional
+
+from bson import ObjectId, json_util
+
+from main.lib.database import mainDB
+from configs import gui_config
+
+from constants.versions import Version
+
+DEFAULT_SNAPSHOT_PATH = Path.home() / ".test_gui" / "snapshot.sqlite3"
+SNAPSHOT_COLLECTIONS = ["tests"]
+# stored in PRAGMA user_version, snapshots of another version are dropped
+SNAPSHOT_SCHEMA_VERSION = 1
+
+
+def _encodeDefault(value: Any) -> Any:
+    match value:
+        case Version():
+            return {"$version": value.toDict()}
+        case PurePath():
+            return {"$path": value.as_posix()}
+    raise TypeError(f"{type(value).__name__} not stored in the local snapshot")
+
+
+def _decodeHook(value: dict) -> Any:
+    if "$version" in value:
+        return Version(value["$version"])
+    if "$path" in value:
+        return Path(value["$path"])
+    return json_util.object_hook(value)
+
+
+def _dumps(value: Any) -> str:
+    return json_util.dumps(value, default=_encodeDefault)
+
+
+def _loads(data: str) -> Any:
+    # plain data only, a tampered snapshot can not run code
+    return json.loads(data, object_hook=_decodeHook)
+
+
+class LocalSnapshot:
+    """Local SQLite copy of the test documents, and of the picker lists.
+
+    Meant for read-only sessions: the GUI reads from it instantly (and keeps working if the
+    database is briefly unreachable) while refresh brings it up to date in background, only
+    fetching documents whose lastUpdateDate changed. Documents are stored as MongoDB extended
+    JSON (bson.json_util), Version and Path values tagged so they are read back as such.
+    """
+
+    # above this number of changed documents, the whole collection is fetched in a single query
+    BULK_FETCH_THRESHOLD = 50
+
+    def __init__(self, path: Path = DEFAULT_SNAPSHOT_PATH) -> None:
+        self.path = Path(path)
+        self.enabled = False
+        self._connection: sqlite3.Connection = None
+        # read from the GUI thread, refreshed from a worker
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            if self._connection.execute("PRAGMA user_version").fetchone()[0] != SNAPSHOT_SCHEMA_VERSION:
+                # older format, fetched again on next refresh
+                self._connection.executescript("DROP TABLE IF EXISTS documents; DROP TABLE IF EXISTS meta;")
+            self._connection.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS documents (
+                    collection TEXT NOT NULL,
+                    id BLOB NOT NULL,
+                    lastUpdateDate TEXT,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (collection, id)
+                );
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                PRAGMA user_version = {SNAPSHOT_SCHEMA_VERSION};
+                """
+            )
+        return self._connection
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    # ------------------------------ READS ------------------------------ #
+
+    def getDocument(self, collection: str, documentId: ObjectId) -> Optional[dict]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT data FROM documents WHERE collection = ? AND id = ?", (collection, documentId.binary)
+            ).fetchone()
+        return _loads(row[0]) if row is not None else None
+
+    def getMeta(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return _loads(row[0]) if row is not None else default
+
+    # ------------------------------ REFRESH ------------------------------ #
+
+    def _setMeta(self, key: str, value: Any):
+        with self._lock:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, _dumps(value))
+                )
+
+    def _refreshCollection(self, collection: str) -> list[ObjectId]:
+        dbCollection = getattr(mainDB, collection)
+        # compared encoded, as stored
+        with self._lock:
+            stored = {
+                ObjectId(id): lastUpdateDate
+                for id, lastUpdateDate in self._connect().execute(
+                    "SELECT id, lastUpdateDate FROM documents WHERE collection = ?", (collection,)
+                )
+            }
+        current = {
+            document["_id"]: document.get("lastUpdateDate")
+            for document in dbCollection.get(projection={"lastUpdateDate": True})
+        }
+        # documents without lastUpdateDate can not be compared, they are always fetched again
+        changedIds = [
+            documentId
+            for documentId, lastUpdateDate in current.items()
+            if lastUpdateDate is None or stored.get(documentId) != _dumps(lastUpdateDate)
+        ]
+        removedIds = stored.keys() - current.keys()
+
+        if len(changedIds) > self.BULK_FETCH_THRESHOLD:
+            changed = set(changedIds)
+            documents = [document for document in dbCollection.get() if document["_id"] in changed]
+        else:
+            documents = [document for documentId in changedIds for document in dbCollection.get(id=documentId)]
+
+        with self._lock:
+            with self._connect() as connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            collection,
+                            document["_id"].binary,
+                            _dumps(document.get("lastUpdateDate")),
+                            _dumps(document),
+                        )
+                        for document in documents
+                    ],
+                )
+                connection.executemany(
+                    "DELETE FROM documents WHERE collection = ? AND id = ?",
+                    [(collection, documentId.binary) for documentId in removedIds],
+                )
+        return changedIds + list(removedIds)
+
+    def refresh(self) -> dict[str, list[ObjectId]]:
+        """Bring the snapshot up to date, return the changed or removed ids per collection."""
+        changes = {collection: self._refreshCollection(collection) for collection in SNAPSHOT_COLLECTIONS}
+        self._setMeta("testList", list(mainDB.tests.getOrderedList(gui_config.MOST_USED_TEST)))
+        self._setMeta("objectTypes", list(mainDB.objects.OBJECT_TYPE_LIST))
+        logging.info(
+            "Local snapshot refreshed: "
+            + ", ".join(f"{len(ids)} {collection} changed" for collection, ids in changes.items())
+        )
+        return changes
+
+
+localSnapshot = LocalSnapshot()
+
+
+def _snapshotMeta(key: str) -> Any:
+    if not localSnapshot.enabled:
+        return None
+    try:
+        return localSnapshot.getMeta(key)
+    except sqlite3.Error as e:
+        logging.warning(f"Local snapshot not readable: {e}")
+        return None
+
+
+def getOrderedTestList() -> list[dict]:
+    """Tests of the picker, from the local snapshot when available."""
+    testList = _snapshotMeta("testList")
+    if testList is None:
+        testList = mainDB.tests.getOrderedList(gui_config.MOST_USED_TEST)
+    return testList
+
+
+def getObjectTypes() -> list[str]:
+    objectTypes = _snapshotMeta("objectTypes")
+    if objectTypes is None:
+        objectTypes = mainDB.objects.OBJECT_TYPE_LIST
+    return objectTypes
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import os
+import enum
+import json
+import logging
+from pathlib import Path
+from zipfile import ZipFile, BadZipFile
+from xml.etree import ElementTree
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from main.scripts.gui.test_gui.workers import Worker
+
+DEFAULT_TEMPLATE_CACHE_PATH = Path.home() / ".test_gui" / "templates.json"
+CORE_PROPERTIES_TITLE = "{http://purl.org/dc/elements/1.1/}title"
+
+
+class TEMPLATE_FORMAT(enum.Enum):
+    WORD = "Word files (*.docx)"
+    PPTX = "Powerpoint files (*.pptx)"
+
+
+TEMPLATE_SUFFIXES = {".docx": TEMPLATE_FORMAT.WORD, ".pptx": TEMPLATE_FORMAT.PPTX}
+
+
+class TEMPLATE_STATUS(enum.Enum):
+    UNKNOWN = "Template catalog not loaded yet"
+    OK = ""
+    MISSING = "Template not found"
+    CHANGED = "Template modified since the test was saved"
+
+
+class TemplateInfo(NamedTuple):
+    # posix path relative to the catalog root
+    path: str
+    mtime: float
+    size: int
+    title: str
+
+    @property
+    def format(self) -> TEMPLATE_FORMAT:
+        return TEMPLATE_SUFFIXES[Path(self.path).suffix.lower()]
+
+
+def readTitle(filePath: str) -> str:
+    """Title of an Office document from its core properties, empty if none."""
+    try:
+        with ZipFile(filePath) as document:
+            title = ElementTree.fromstring(document.read("docProps/core.xml")).find(CORE_PROPERTIES_TITLE)
+    except (OSError, KeyError, BadZipFile, ElementTree.ParseError):
+        return ""
+    return title.text or "" if title is not None else ""
+
+
+def scanTemplates(root: Path, directories: list[Path], known: dict[str, TemplateInfo]) -> dict[str, TemplateInfo]:
+    """Templates found under directories.
+
+    Files whose mtime and size are the ones in known are not opened again.
+    """
+    templates: dict[str, TemplateInfo] = {}
+    pending = list(directories)
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:  # removed meanwhile or not readable
+            continue
+        for entry in entries:
+            if entry.name.startswith((".", "~$")):  # hidden and Office lock files
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(Path(entry.path))
+                    continue
+                if Path(entry.name).suffix.lower() not in TEMPLATE_SUFFIXES:
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            path = Path(entry.path).relative_to(root).as_posix()
+            info = known.get(path)
+            if info is None or info.mtime != stat.st_mtime or info.size != stat.st_size:
+                info = TemplateInfo(path, stat.st_mtime, stat.st_size, readTitle(entry.path))
+            templates[path] = info
+    return templates
+
+
+def _isUnder(path: str, directory: str) -> bool:
+    """Whether the posix path relative to the root is in directory (relative too, "." for the root)."""
+    return directory == "." or path.startswith(directory + "/")
+
+
+class TemplateCatalog(QtCore.QObject):
+    """Report/debrief templates under the working directory, scanned in background.
+
+    The previous scan is read back from a local cache so the catalog is usable right away,
+    a file is only opened again when its mtime or size changed. The root, the directories holding
+    templates and their parents are then watched (a share may hold far more directories than the
+    watcher can take), and only the subtree of a changed directory is scanned again. Templates
+    added elsewhere show up on the next start.
+    """
+
+    changed = QtCore.Signal()
+    # network shares report changes in bursts
+    RESCAN_DELAY_MS = 500
+
+    def __init__(self, cachePath: Path = DEFAULT_TEMPLATE_CACHE_PATH, parent: QtCore.QObject = None) -> None:
+        super().__init__(parent)
+        self.cachePath = Path(cachePath)
+        self.root: Path = None
+        self.isLoaded = False
+        self._templates: dict[str, TemplateInfo] = {}
+        self._scanner: Worker = None
+        self._pendingDirectories: set[str] = set()
+        self._watcher: QtCore.QFileSystemWatcher = None
+        self._rescanTimer: QtCore.QTimer = None
+
+    def isStarted(self) -> bool:
+        return self.root is not None
+
+    def start(self, root: Path = None):
+        """Serve the cached catalog of root (working directory by default) and scan it again in background."""
+        if self.isStarted():
+            return
+        self.root = Path(root or Path.cwd()).resolve()
+        self._watcher = QtCore.QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self.on_directoryChanged)
+        self._rescanTimer = QtCore.QTimer(self)
+        self._rescanTimer.setSingleShot(True)
+        self._rescanTimer.setInterval(self.RESCAN_DELAY_MS)
+        self._rescanTimer.timeout.connect(self._rescanPending)
+        self._templates = self._loadCache()
+        if self._templates:
+            self.changed.emit()
+        self.rescan()
+
+    def rescan(self):
+        if self._scanner is not None:
+            return
+        self._scanner = Worker(scanTemplates, self.root, [self.root], dict(self._templates))
+        self._scanner.signals.finished.connect(self.on_scanFinished)
+        self._scanner.signals.failed.connect(self.on_scanFailed)
+        self._scanner.start()
+
+    def _rescanPending(self):
+        if self._scanner is not None or not self._pendingDirectories:  # retried once the scan ends
+            return
+        # sub directories of a pending directory are scanned with it
+        pending = sorted(self._pendingDirectories)
+        self._pendingDirectories.clear()
+        directories: list[Path] = []
+        for directory in map(Path, pending):
+            if not any(directory.is_relative_to(scanned) for scanned in directories):
+                directories.append(directory)
+        self._scanner = Worker(scanTemplates, self.root, directories, dict(self._templates))
+        self._scanner.signals.finished.connect(lambda templates: self.on_scanFinished(templates, directories))
+        self._scanner.signals.failed.connect(self.on_scanFailed)
+        self._scanner.start()
+
+    def _watchedDirectories(self) -> set[str]:
+        """The root, the directories holding templates and their parents, where new sub directories show up."""
+        directories = {str(self.root)}
+        for path in self._templates:
+            directory = (self.root / path).parent
+            directories.add(str(directory))
+            if directory != self.root:
+                directories.add(str(directory.parent))
+        return directories
+
+    # ------------------------------ CACHE ------------------------------ #
+
+    def _loadCache(self) -> dict[str, TemplateInfo]:
+        try:
+            cache = json.loads(self.cachePath.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Template catalog cache not readable, starting over: {e}")
+            return {}
+        if cache.get("root") != str(self.root):
+            return {}
+        return {path: TemplateInfo(path, *values) for path, values in cache["templates"].items()}
+
+    def _saveCache(self):
+        cache = {
+            "root": str(self.root),
+            "templates": {path: [info.mtime, info.size, info.title] for path, info in self._templates.items()},
+        }
+        try:
+            self.cachePath.parent.mkdir(parents=True, exist_ok=True)
+            tmpPath = self.cachePath.with_suffix(".tmp")
+            tmpPath.write_text(json.dumps(cache, separators=(",", ":")))
+            os.replace(tmpPath, self.cachePath)
+        except OSError as e:
+            logging.warning(f"Template catalog cache not saved: {e}")
+
+    # ------------------------------ QUERIES ------------------------------ #
+
+    def templates(self, templateFormat: Optional[TEMPLATE_FORMAT] = None) -> list[TemplateInfo]:
+        return sorted(
+            (info for info in self._templates.values() if templateFormat is None or info.format == templateFormat),
+            key=lambda info: info.path.lower(),
+        )
+
+    def search(self, text: str, templateFormat: Optional[TEMPLATE_FORMAT] = None) -> list[TemplateInfo]:
+        text = text.lower()
+        return [
+            info for info in self.templates(templateFormat) if text in info.path.lower() or text in info.title.lower()
+        ]
+
+    def status(self, path: str, since: Optional[datetime] = None) -> TEMPLATE_STATUS:
+        """Whether the template at path (relative to root) exists, and was modified after since."""
+        if not self.isLoaded:
+            return TEMPLATE_STATUS.UNKNOWN
+        if (info := self._templates.get(path)) is None:
+            return TEMPLATE_STATUS.MISSING
+        if since is not None:
+            # database dates are naive UTC
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            if info.mtime > since.timestamp():
+                return TEMPLATE_STATUS.CHANGED
+        return TEMPLATE_STATUS.OK
+
+    # ------------------------------ CALLBACKS ------------------------------ #
+
+    def on_directoryChanged(self, directory: str):
+        self._pendingDirectories.add(directory)
+        self._rescanTimer.start()
+
+    def on_scanFinished(self, templates: dict[str, TemplateInfo], directories: list[Path] = None):
+        self._scanner = None
+        if directories is None:
+            self._templates = templates
+        else:
+            rescanned = [directory.relative_to(self.root).as_posix() for directory in directories]
+            self._templates = {
+                path: info
+                for path, info in self._templates.items()
+                if not any(_isUnder(path, directory) for directory in rescanned)
+            }
+            self._templates.update(templates)
+        self.isLoaded = True
+        watched = set(self._watcher.directories())
+        toWatch = self._watchedDirectories()
+        if toUnwatch := list(watched - toWatch):
+            self._watcher.removePaths(toUnwatch)
+        if toWatch := list(toWatch - watched):
+            self._watcher.addPaths(toWatch)
+        self._saveCache()
+        self.changed.emit()
+        self._rescanPending()
+
+    def on_scanFailed(self, error: Exception):
+        self._scanner = None
+        logging.warning(f"Template catalog not scanned: {error}")
+        self._rescanPending()
+
+
+templateCatalog = TemplateCatalog()
+
+
+class TemplatePickerDialog(QtWidgets.QDialog):
+    """Searchable list (path and title) of the catalog templates of one format, a file dialog as last resort."""
+
+    FILTER_ROLE = QtCore.Qt.ItemDataRole.UserRole + 1
+
+    def __init__(
+        self, parent: Optional[QtWidgets.QWidget], templateFormat: TEMPLATE_FORMAT, title: str,
+        catalog: TemplateCatalog = templateCatalog,
+    ) -> None:
+        super().__init__(parent=parent)
+        self.setWindowTitle(title)
+        self.templateFormat = templateFormat
+        self.catalog = catalog
+        self.catalog.start()
+        # absolute path of the chosen template
+        self.selectedPath: Path = None
+        self.mainLayout = QtWidgets.QVBoxLayout()
+        self.setLayout(self.mainLayout)
+
+        self.searchLE = QtWidgets.QLineEdit(self)
+        self.searchLE.setPlaceholderText("Type to filter templates...")
+        self.searchLE.setClearButtonEnabled(True)
+        self.mainLayout.addWidget(self.searchLE)
+
+        self.templateModel = QtGui.QStandardItemModel(self)
+        self.filterModel = QtCore.QSortFilterProxyModel(self)
+        self.filterModel.setSourceModel(self.templateModel)
+        self.filterModel.setFilterCaseSensitivity(QtCore.Qt.CaseSensitivity.CaseInsensitive)
+        self.filterModel.setFilterRole(self.FILTER_ROLE)
+        self.searchLE.textChanged.connect(self.filterModel.setFilterFixedString)
+        self.templateLV = QtWidgets.QListView(self)
+        self.templateLV.setUniformItemSizes(True)
+        self.templateLV.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.templateLV.setModel(self.filterModel)
+        self.templateLV.doubleClicked.connect(self.accept)
+        self.mainLayout.addWidget(self.templateLV)
+
+        self.statusLabel = QtWidgets.QLabel(self)
+        self.mainLayout.addWidget(self.statusLabel)
+
+        self.buttonBox = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Ok | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        self.browsePB = self.buttonBox.addButton("Browse...", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        self.browsePB.clicked.connect(self.on_browsePBClicked)
+        self.buttonBox.accepted.connect(self.accept)
+        self.buttonBox.rejected.connect(self.reject)
+        self.mainLayout.addWidget(self.buttonBox)
+
+        self.templateLV.selectionModel().selectionChanged.connect(self.updateOkButton)
+        self.catalog.changed.connect(self.on_catalogChanged)
+        self._connected = True
+        self.on_catalogChanged()
+
+    def updateOkButton(self):
+        self.buttonBox.button(QtWidgets.QDialogButtonBox.StandardButton.Ok).setEnabled(
+            self.templateLV.selectionModel().hasSelection()
+        )
+
+    def accept(self):
+        if not (indexes := self.templateLV.selectionModel().selectedIndexes()):
+            return
+        self.selectedPath = self.catalog.root / indexes[0].data()
+        super().accept()
+
+    def done(self, result: int):
+        # the catalog outlives the dialog
+        if self._connected:
+            self.catalog.changed.disconnect(self.on_catalogChanged)
+            self._connected = False
+        super().done(result)
+
+    # ------------------------------ CALLBACKS ------------------------------ #
+
+    def on_catalogChanged(self):
+        templates = self.catalog.templates(self.templateFormat)
+        self.templateModel.clear()
+        for info in templates:
+            item = QtGui.QStandardItem(info.path)
+            item.setToolTip(info.title)
+            item.setData(f"{info.path}\n{info.title}", self.FILTER_ROLE)
+            self.templateModel.appendRow(item)
+        self.statusLabel.setText(f"{len(templates)} templates" + ("" if self.catalog.isLoaded else ", scanning..."))
+        self.updateOkButton()
+
+    def on_browsePBClicked(self):
+        filePath, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, self.windowTitle(), str(self.catalog.root), self.templateFormat.value
+        )
+        if filePath:
+            self.selectedPath = Path(filePath)
+            super().accept()
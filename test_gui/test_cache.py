@@ -0,0 +1,153 @@
+import logging
+import threading
+from time import monotonic
+from copy import deepcopy
+from typing import Optional
+from collections import OrderedDict
+
+from bson import ObjectId
+
+from main.lib.database import mainDB
+from main.scripts.gui.test_gui.local_snapshot import localSnapshot
+
+from constants.versions import Version
+
+# fields set by the database on each write
+SERVER_KEYS = ["lastUpdateDate", "lastUpdateUser"]
+
+
+class SaveConflictError(Exception):
+    """The test was saved by someone else since it was read."""
+
+
+class TestCache:
+    """Bounded LRU of test documents keyed by _id.
+
+    Entries younger than ttl seconds are served as is, older ones are revalidated
+    against the stored lastUpdateDate before being served. Writes made through the
+    cache invalidate the related entry.
+
+    When the local snapshot is enabled, missing entries are first served from it and
+    it is used as fallback when the database can not be reached.
+    """
+
+    def __init__(self, maxSize: int = 32, ttl: float = 60.0) -> None:
+        self.maxSize = maxSize
+        self.ttl = ttl
+        # _id -> (last validation time, test document)
+        self._entries: OrderedDict[ObjectId, tuple[float, dict]] = OrderedDict()
+        # tests are also loaded from worker threads
+        self._lock = threading.Lock()
+
+    def get(self, testId: ObjectId, revalidate: bool = False) -> dict:
+        """Return a copy of the test document, safe to be modified by the caller.
+
+        revalidate forces the lastUpdateDate check even if the entry is still fresh.
+        """
+        with self._lock:
+            entry = self._entries.get(testId)
+        if entry is not None:
+            validationTime, testData = entry
+            if (not revalidate and monotonic() - validationTime < self.ttl) or self.isUpToDate(
+                testId, testData
+            ):
+                self._put(testId, testData)
+                return deepcopy(testData)
+
+        elif localSnapshot.enabled and (testData := localSnapshot.getDocument("tests", testId)) is not None:
+            self._put(testId, testData)
+            return deepcopy(testData)
+
+        try:
+            testData = mainDB.tests.get(id=testId)[0]
+        except Exception as e:
+            if not localSnapshot.enabled or (testData := localSnapshot.getDocument("tests", testId)) is None:
+                raise
+            logging.warning(f"Test {testId} served from local snapshot, database not reachable: {e}")
+        self._put(testId, testData)
+        return deepcopy(testData)
+
+    def isUpToDate(self, testId: ObjectId, testData: dict) -> bool:
+        """Whether testData has the stored lastUpdateDate."""
+        try:
+            stored = mainDB.tests.get(id=testId, projection={"lastUpdateDate": True})
+        except Exception as e:
+            if not localSnapshot.enabled:
+                raise
+            logging.warning(f"Test {testId} not revalidated, database not reachable: {e}")
+            return True
+        return len(stored) > 0 and stored[0].get("lastUpdateDate") == testData.get("lastUpdateDate")
+
+    def _put(self, testId: ObjectId, testData: dict):
+        with self._lock:
+            self._entries[testId] = (monotonic(), testData)
+            self._entries.move_to_end(testId)
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, testId: ObjectId):
+        with self._lock:
+            self._entries.pop(testId, None)
+
+    def invalidateMany(self, testIds: list[ObjectId]):
+        with self._lock:
+            for testId in testIds:
+                self._entries.pop(testId, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ------------------------------ WRITES ------------------------------ #
+
+    def update(self, testId: ObjectId, updateDict: dict) -> bool:
+        updated = mainDB.tests.update(testId, updateDict)
+        self.invalidate(testId)
+        return updated
+
+    def saveChanges(self, testId: ObjectId, testData: dict, updateDict: dict, force: bool = False) -> Optional[dict]:
+        """Write updateDict over testData, the document read before the edits.
+
+        Raises SaveConflictError if the stored lastUpdateDate is not the one of testData
+        (unless force). Returns the stored document without reading it back, only the
+        server set fields are fetched (the whole document when forced, others' changes
+        are kept in the fields not edited). None if the update failed.
+
+        mainDB has no conditional update: the lastUpdateDate check and the update are two
+        calls, a save made by someone else between them is still overwritten.
+        """
+        if not force and not self.isUpToDate(testId, testData):
+            self.invalidate(testId)
+            raise SaveConflictError(testId)
+        if not mainDB.tests.update(testId, updateDict):
+            self.invalidate(testId)
+            return None
+        if force:
+            stored = mainDB.tests.get(id=testId)
+        else:
+            stored = mainDB.tests.get(id=testId, projection={key: True for key in SERVER_KEYS})
+        if not stored:
+            self.invalidate(testId)
+            return None
+        if force:
+            testData = stored[0]
+        else:
+            testData = {**testData, **updateDict, **{key: stored[0].get(key) for key in SERVER_KEYS}}
+        # cached as read from the database, edited versions are dicts
+        if isinstance(testData.get("version"), dict):
+            testData["version"] = Version(testData["version"])
+        self._put(testId, testData)
+        return deepcopy(testData)
+
+    def create(self, **kwargs) -> ObjectId:
+        testId = mainDB.tests.create(**kwargs)
+        self.invalidate(testId)
+        return testId
+
+    def duplicateFrom(self, testId: ObjectId) -> ObjectId:
+        newTestId = mainDB.tests.duplicateFrom(testId=testId)
+        self.invalidate(newTestId)
+        return newTestId
+
+
+testCache = TestCache()
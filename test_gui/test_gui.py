@@ -1,50 +1,154 @@
 import sys
-import enum
+import logging
 from typing import Any
 
 # from bson import DBRef
 from pathlib import Path
-from copy import deepcopy
+from copy import copy
 from bson import ObjectId
-from PySide6 import QtWidgets, QtGui
-from PySide6 import (
-    QtWebEngineWidgets,
-)  # noqa F401 : Needs to be loaded before loading UI
+from PySide6 import QtWidgets, QtGui, QtCore
 
 from main.lib.misc import utils
 from main.lib.database import mainDB
 from main.scripts.gui.parent_gui import MainWindow, MainApp
 from main.scripts.gui.ui.ui_test_gui import Ui_TestGUI
 from main.scripts.gui.test_gui.ask_test_gui import AskTestDialog
-from main.scripts.gui.tracks_gui.tracks_gui import TracksViewDialog
+from main.scripts.gui.test_gui.test_cache import testCache, SaveConflictError
+from main.scripts.gui.test_gui.db_instrumentation import dbInstrumentation, ActionRecord
+from main.scripts.gui.test_gui.widget_binding import BindingEngine
+from main.scripts.gui.test_gui.workers import Worker
+from main.scripts.gui.test_gui.local_snapshot import localSnapshot, getObjectTypes
+from main.scripts.gui.test_gui.usage_stats import usageStats
+from main.scripts.gui.test_gui.workspace_cache import TestWorkspace, WorkspaceCache
+from main.scripts.gui.test_gui.template_catalog import (
+    TEMPLATE_FORMAT,
+    TEMPLATE_STATUS,
+    TemplatePickerDialog,
+    templateCatalog,
+)
 
 from constants.versions import Version
 
+# Allows QtWebEngine to be loaded once the application is running, see TestWindow.__init__
+QtCore.QCoreApplication.setAttribute(QtCore.Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
 
-class TEMPLATE_FORMAT(enum.Enum):
-    WORD = "Word files (*.docx)"
-    PPTX = "Powerpoint files (*.pptx)"
+
+_MISSING = object()
+
+
+def _setInCopy(container: Any, mapList: list[str], value: Any) -> Any:
+    """Copy of container with value set at mapList, only the containers on the path are copied."""
+    if not mapList:
+        return value
+    key, *rest = mapList
+    copied = copy(container)
+    copied[key] = _setInCopy(container[key], rest, value) if rest else value
+    return copied
 
 
 class TestModel:
-    def __init__(self, testId: ObjectId) -> None:
-        self.testData = mainDB.tests.get(id=testId)[0]
+    """Test document being edited.
+
+    The loaded document is kept as an immutable baseline and edits in an overlay of
+    top level key -> new value, a nested edit only copying the containers on its path.
+    Cancel, save and undo/redo are proportional to the changed fields. The Qt side
+    conversion of each top level field is built once, and rebuilt only once it changes.
+    """
+
+    # keys handled by the database itself, never sent back on save
+    READ_ONLY_KEYS = ["_id", "lastUpdateDate", "creationDate", "lastUpdateUser"]
+    UNDO_LIMIT = 100
+
+    def __init__(self, testId: ObjectId, revalidate: bool = False) -> None:
+        self._baseline: dict = {}
+        self._overlay: dict[str, Any] = {}
+        # (top level key, overlay value before the edit), _MISSING when it was not edited
+        self._undoStack: list[tuple[str, Any]] = []
+        self._redoStack: list[tuple[str, Any]] = []
+        # top level key -> value converted by _to_qt, see getData
+        self._qtView: dict[str, Any] = {}
+        self._load(testId, revalidate=revalidate)
+
+    def _load(self, testId: ObjectId, revalidate: bool = False):
+        self._setBaseline(testCache.get(testId, revalidate=revalidate))
+
+    def _setBaseline(self, testData: dict):
         # for WIDGET_DATABASE_MAPKEYLISTS_MAPPING use, convert testData to full dict
-        self.testData["version"] = self.testData["version"].toDict()
+        if isinstance(testData["version"], Version):
+            testData["version"] = testData["version"].toDict()
+        self._baseline = testData
+        self._qtView.clear()
+        self.revert()
+
+    @property
+    def testData(self) -> dict:
+        """Test document with the edits applied, not to be modified."""
+        return {**self._baseline, **self._overlay} if self._overlay else self._baseline
+
+    def _source(self, key: str) -> dict:
+        return self._overlay if key in self._overlay else self._baseline
+
+    def _get(self, key: str) -> Any:
+        return self._source(key).get(key)
 
     def __str__(self) -> str:
-        _testData = deepcopy(self.testData)
-        _testData["version"] = Version(
-            self.testData["version"]
-        )  # convert back to Version object for display
-        return f"{_testData['name']} - {_testData['version']}"
+        # convert back to Version object for display
+        return f"{self._get('name')} - {Version(self._get('version'))}"
+
+    def _setOverlay(self, key: str, value: Any):
+        self._qtView.pop(key, None)
+        if value is _MISSING or value == self._baseline.get(key, _MISSING):
+            self._overlay.pop(key, None)
+        else:
+            self._overlay[key] = value
 
     def setData(self, mapList: list[str], value: Any):
+        key = mapList[0]
         try:
-            utils.setInDict(self.testData, mapList, value)
-        except TypeError:
-            if self.testData is None:
-                raise RuntimeError("Test Data not initialized yet.")
+            changed = utils.getFromDict(self._source(key), mapList) != value
+        except KeyError:
+            changed = True
+        if not changed:
+            return
+        newValue = _setInCopy(self._get(key), mapList[1:], value)
+
+        self._undoStack.append((key, self._overlay.get(key, _MISSING)))
+        del self._undoStack[: -self.UNDO_LIMIT]
+        self._redoStack.clear()
+        self._setOverlay(key, newValue)
+
+    def isDirty(self) -> bool:
+        return len(self._overlay) > 0
+
+    def canUndo(self) -> bool:
+        return len(self._undoStack) > 0
+
+    def canRedo(self) -> bool:
+        return len(self._redoStack) > 0
+
+    def undo(self) -> bool:
+        if not self._undoStack:
+            return False
+        key, value = self._undoStack.pop()
+        self._redoStack.append((key, self._overlay.get(key, _MISSING)))
+        self._setOverlay(key, value)
+        return True
+
+    def redo(self) -> bool:
+        if not self._redoStack:
+            return False
+        key, value = self._redoStack.pop()
+        self._undoStack.append((key, self._overlay.get(key, _MISSING)))
+        self._setOverlay(key, value)
+        return True
+
+    def revert(self):
+        """Drop every edit since last load/save."""
+        for key in self._overlay:
+            self._qtView.pop(key, None)
+        self._overlay.clear()
+        self._undoStack.clear()
+        self._redoStack.clear()
 
     def _to_qt(self, value: Any) -> Any:
         match value:
@@ -61,36 +165,58 @@ class TestModel:
 
         return value
 
-    def getData(self, mapList: list[str]) -> Any:
+    def _qtValue(self, key: str) -> Any:
         try:
-            value = utils.getFromDict(self.testData, mapList)
-            value = self._to_qt(value)
-        except TypeError:
-            if self.testData is None:
-                raise RuntimeError("Test Data not initialized yet.")
-        return value
-
-    def saveData(self) -> bool:
-        updateDict = deepcopy(self.testData)
-        for key in ["_id", "lastUpdateDate", "creationDate", "lastUpdateUser"]:
-            updateDict.pop(key)
-        for key in updateDict:
-            if isinstance(updateDict[key], str):
-                updateDict[key] = utils.removeWhitespace(updateDict[key])
-        updated = mainDB.tests.update(self.testData["_id"], updateDict)
-        return updated
+            return self._qtView[key]
+        except KeyError:
+            value = self._qtView[key] = self._to_qt(self._source(key)[key])
+            return value
 
-    def refresh(self):
-        if (testId := self.testData.get("_id")) is not None:
-            # mainDB._clearCache()  # TODO
-            self.testData = mainDB.tests.get(id=testId)[0]
+    def getData(self, mapList: list[str]) -> Any:
+        """Qt ready value at mapList, shared with the next calls: not to be modified."""
+        value = self._qtValue(mapList[0])
+        return utils.getFromDict(value, mapList[1:]) if len(mapList) > 1 else value
+
+    def saveData(self, force: bool = False) -> bool:
+        """Save the edited fields, SaveConflictError if someone else saved the test meanwhile.
+
+        force overwrites their changes.
+        """
+        # partial update: only the top level fields edited since last load/save
+        if not self.isDirty():
+            return True
+
+        updateDict = {}
+        for key, value in self._overlay.items():
+            if key in self.READ_ONLY_KEYS:
+                continue
+            if isinstance(value, str):
+                value = utils.removeWhitespace(value)
+            updateDict[key] = value
+
+        stored = testCache.saveChanges(self._baseline["_id"], self._baseline, updateDict, force=force)
+        if stored is None:
+            return False
+        # in sync with the database, server set fields included
+        self._setBaseline(stored)
+        return True
+
+    def isUpToDate(self) -> bool:
+        """Whether nobody saved the test since it was loaded (cheap lastUpdateDate query)."""
+        return testCache.isUpToDate(self._baseline["_id"], self._baseline)
 
 
 class TestWindow(Ui_TestGUI, MainWindow):
-    def __init__(self, parent=None):
+    LOADING_SUFFIX = " (loading...)"
+    # only load test dependent tabs the first time they are shown
+    LAZY_TABS = True
+
+    def __init__(self, parent=None, testId: ObjectId = None):
         super().__init__(parent=parent)
 
         # Load frontend
+        from PySide6 import QtWebEngineWidgets  # noqa F401 : Needs to be loaded before loading UI
+
         self.setupUi(self)
         self.initWindowTitle()
 
@@ -106,10 +232,42 @@ class TestWindow(Ui_TestGUI, MainWindow):
             self.debriefTemplatesListWidget: ["debriefFilePathList"],
         }
 
+        # test dependent tabs, loaded once the test is fetched (on first visit in LAZY_TABS mode)
+        self.TAB_LOADERS = {
+            self.tab: self.descriptionEditorWidget.init_gui,
+            self.tab_2: self.scoreTestViewer.loadTest,
+            self.winsDescriptionEditor: self.winsDescriptionEditor.setTestId,
+        }
+
         self.initWidgets()
 
+        self.testId: ObjectId = None
         self.testModel: TestModel = None
-        self.initTest()
+        self._testLoader: Worker = None
+        self._loadAction: ActionRecord = None
+        self._pendingTabs: list[QtWidgets.QWidget] = []
+        self._staleTabs: set[QtWidgets.QWidget] = set()
+        # test each tab was last loaded with
+        self._tabTestIds: dict[QtWidgets.QWidget, ObjectId] = {}
+        # usage is only recorded for tests opened by the user, not reloads
+        self._recordOpen = False
+        # recently shown tests, swapped back in without reloading
+        self.workspaces = WorkspaceCache()
+        self.tab_5.currentChanged.connect(self.on_tabChanged)
+
+        # undo/redo of the edits made since Edit was clicked
+        self.editing = False
+        self.undoAction = QtGui.QAction("Undo")
+        self.undoAction.setShortcut(QtGui.QKeySequence.StandardKey.Undo)
+        self.undoAction.triggered.connect(self.on_undoTriggered)
+        self.redoAction = QtGui.QAction("Redo")
+        self.redoAction.setShortcut(QtGui.QKeySequence.StandardKey.Redo)
+        self.redoAction.triggered.connect(self.on_redoTriggered)
+
+        if testId is None:
+            self.initTest()
+        else:
+            self.loadTest(testId)
 
         # add test menu
         self.testMenu = QtWidgets.QMenu(self.menubar)
@@ -122,15 +280,33 @@ class TestWindow(Ui_TestGUI, MainWindow):
         self.loadTestAction.setShortcut("Ctrl+L")
         self.loadTestAction.triggered.connect(self.on_selectTest)
         self.testMenu.addAction(self.loadTestAction)
+        self.testMenu.addSeparator()
+        self.testMenu.addAction(self.undoAction)
+        self.testMenu.addAction(self.redoAction)
 
         if self.IS_READ_ONLY:
             self.actionTracksGUI.setDisabled(True)
         self.actionTracksGUI.triggered.connect(self.on_actionTracksGUITriggered)
 
+        # database calls summary of the last action, and trace dump on demand
+        dbInstrumentation.summaryChanged.connect(self.statusbar.showMessage)
+        self.dumpDbTraceAction = QtGui.QAction("Dump DB Trace...")
+        self.dumpDbTraceAction.triggered.connect(self.on_dumpDbTraceTriggered)
+        self.menuTools.addAction(self.dumpDbTraceAction)
+        # BSON encoding of each call, off by default
+        self.measurePayloadAction = QtGui.QAction("Measure DB Payload Sizes")
+        self.measurePayloadAction.setCheckable(True)
+        self.measurePayloadAction.setChecked(dbInstrumentation.measurePayload)
+        self.measurePayloadAction.toggled.connect(self.on_measurePayloadToggled)
+        self.menuTools.addAction(self.measurePayloadAction)
+
+        # missing/modified templates are flagged once the catalog is scanned
+        templateCatalog.changed.connect(self.flagTemplates)
+
     # ------------------------------ INIT ------------------------------ #
 
     def initWidgets(self):
-        for objectType in mainDB.objects.OBJECT_TYPE_LIST:
+        for objectType in getObjectTypes():
             self.objectTypeCoB.addItem(objectType, objectType)
 
         for widget in [
@@ -151,26 +327,10 @@ class TestWindow(Ui_TestGUI, MainWindow):
         ]:
             widget.setDisabled(True)
 
-        for widget, dbKey in self.WIDGET_DATABASE_MAPKEYLISTS_MAPPING.items():
-            match widget:
-                case QtWidgets.QLineEdit():
-                    widget.editingFinished.connect(
-                        self._getGenericCallBack(widget, dbKey)
-                    )
-                case QtWidgets.QComboBox():
-                    widget.currentTextChanged.connect(
-                        self._getGenericCallBack(widget, dbKey)
-                    )
-                case QtWidgets.QSpinBox():
-                    widget.valueChanged.connect(self._getGenericCallBack(widget, dbKey))
-                case QtWidgets.QTextEdit():
-                    widget.textChanged.connect(self._getGenericCallBack(widget, dbKey))
-                case QtWidgets.QListWidget():
-                    pass  # No signal for data changes, will be handle manually with buttons
-                case QtWidgets.QCheckBox():
-                    widget.stateChanged.connect(self._getGenericCallBack(widget, dbKey))
-                case _:
-                    raise NotImplementedError
+        # getters/setters/signals resolved once, see widget_binding
+        self.bindingEngine = BindingEngine(
+            self.WIDGET_DATABASE_MAPKEYLISTS_MAPPING, self._onWidgetEdited
+        )
 
         if not self.IS_READ_ONLY:
             self.editPB.clicked.connect(self.on_editPBClicked)
@@ -205,79 +365,236 @@ class TestWindow(Ui_TestGUI, MainWindow):
                 widget.hide()
 
     def on_selectTest(self):
-        testId = self.initTest()
-        self.scoreTestViewer.loadTest(testId)
+        self.initTest()
 
     def initTest(self):
         askTestDialog = AskTestDialog(self)
         if askTestDialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
             testId = askTestDialog.selectedTestId
-            self.testModel = TestModel(testId)
-
-            self.testLabel.setText(str(self.testModel))
-            self.refresh()
-
-            # init all other tabs data
-            self.scoreTestViewer.loadTest(testId)
-            self.descriptionEditorWidget.init_gui(testId)
-            self.winsDescriptionEditor.setTestId(testId)
+            self.loadTest(testId)
         else:
-            # if cancelled we reuse the previous test used (which happens to be stored in ScoreTestViewer)
-            try:
-                testId = self.scoreTestViewer.testId
-            except AttributeError:  # if no test, we just exit
+            # if cancelled we reuse the previous test used
+            if self.testId is None:  # if no test, we just exit
                 raise SystemExit(1)
+            testId = self.testId
         return testId
 
+    def loadTest(self, testId: ObjectId, revalidate: bool = False):
+        """Show the test, swapped in from the recent workspaces when kept there.
+
+        Otherwise it is fetched in background, General tab first then the other tabs progressively.
+        revalidate reloads the test shown, changed by someone else.
+        """
+        if not revalidate:
+            self._stashWorkspace()
+        self.testId = testId
+        self._recordOpen = not revalidate
+        self._pendingTabs = []
+        self.bindingEngine.discardPending()
+        self._endLoadAction()  # superseded load
+
+        if not revalidate and (workspace := self.workspaces.pop(testId)) is not None:
+            self._restoreWorkspace(workspace)
+            return
+
+        self.testLabel.setText("Loading...")
+        self.enableWidgets(False)
+        self.setEditing(False)
+        self.editPB.setEnabled(False)
+        for tab in self.TAB_LOADERS:
+            self._setTabBusy(tab, True)
+
+        self._loadAction = dbInstrumentation.beginAction("initTest")
+        # TestModel is built out of the GUI thread
+        self._testLoader = Worker(TestModel, testId, revalidate)
+        self._testLoader.signals.finished.connect(self.on_testLoaded)
+        self._testLoader.signals.failed.connect(self.on_testLoadFailed)
+        self._testLoader.start()
+
+    def _endLoadAction(self):
+        if self._loadAction is not None:
+            dbInstrumentation.endAction(self._loadAction)
+            self._loadAction = None
+
+    def _stashWorkspace(self):
+        if self.testModel is None or self.testModel.testData["_id"] != self.testId:
+            return
+        # pending text edits are kept with the test
+        self.bindingEngine.flush()
+        self.workspaces.put(self.testId, TestWorkspace(self.testModel, self.editing, self.tab_5.currentIndex()))
+
+    def _restoreWorkspace(self, workspace: TestWorkspace):
+        self.tab_5.setCurrentIndex(workspace.tabIndex)
+        # only the tabs loaded with another test meanwhile are reloaded
+        self._showTestModel(workspace.testModel, staleTabs={
+            tab for tab in self.TAB_LOADERS if self._tabTestIds.get(tab) != self.testId
+        })
+        self.enableWidgets(workspace.editing)
+        self.setEditing(workspace.editing)
+
+        # swapped in right away, reloaded if someone saved it meanwhile
+        self._loadAction = dbInstrumentation.beginAction("revalidateTest")
+        self._testLoader = Worker(workspace.testModel.isUpToDate)
+        self._testLoader.signals.finished.connect(self.on_testRevalidated)
+        self._testLoader.signals.failed.connect(self.on_testRevalidateFailed)
+        self._testLoader.start()
+
+    def on_testRevalidated(self, upToDate: bool):
+        if self.sender() is not self._testLoader.signals:  # another test was selected meanwhile
+            return
+        self._endLoadAction()
+        if upToDate:
+            return
+        if self.testModel.isDirty():
+            self.statusbar.showMessage("Test modified by someone else since it was loaded.")
+        else:
+            self.loadTest(self.testId, revalidate=True)
+
+    def on_testRevalidateFailed(self, error: Exception):
+        if self.sender() is not self._testLoader.signals:
+            return
+        self._endLoadAction()
+        logging.warning(f"Test {self.testId} not revalidated: {error}")
+
+    def on_testLoaded(self, testModel: TestModel):
+        if self.sender() is not self._testLoader.signals:  # another test was selected meanwhile
+            return
+        self._endLoadAction()
+        if self._recordOpen:
+            usageStats.record(self.testId, str(testModel), "open")
+        self._showTestModel(testModel)
+
+    def _showTestModel(self, testModel: TestModel, staleTabs: set[QtWidgets.QWidget] = None):
+        """Show testModel in the General tab, then (re)load staleTabs (all the tabs by default)."""
+        self.testModel = testModel
+        self.testLabel.setText(str(self.testModel))
+        self.refresh()
+        self.editPB.setEnabled(True)
+
+        # init other tabs data, yielding to the event loop between each
+        self._staleTabs = set(self.TAB_LOADERS) if staleTabs is None else staleTabs
+        if self.LAZY_TABS:
+            self._pendingTabs = [tab for tab in self.TAB_LOADERS if tab is self.tab_5.currentWidget()]
+            for tab in self._staleTabs.difference(self._pendingTabs):
+                self._setTabBusy(tab, False)
+        else:
+            self._pendingTabs = list(self.TAB_LOADERS)
+        QtCore.QTimer.singleShot(0, self._loadNextTab)
+
+    def on_testLoadFailed(self, error: Exception):
+        if self.sender() is not self._testLoader.signals:  # another test was selected meanwhile
+            return
+        testId = self.testId
+        self._endLoadAction()
+        logging.error(f"Failed to load test {testId}: {error}")
+        QtWidgets.QMessageBox.warning(self, "Failed", "Test not loaded. Please check log.")
+        if self.testModel is None:
+            raise SystemExit(1)
+        # fall back on the previous test
+        self.testId = self.testModel.testData["_id"]
+        self.testLabel.setText(str(self.testModel))
+        self.editPB.setEnabled(True)
+        for tab in self.TAB_LOADERS:
+            self._setTabBusy(tab, False)
+
+    def _loadNextTab(self):
+        if not self._pendingTabs:
+            return
+        tab = self._pendingTabs.pop(0)
+        if tab in self._staleTabs:
+            tabTitle = self.tab_5.tabText(self.tab_5.indexOf(tab)).removesuffix(self.LOADING_SUFFIX)
+            with dbInstrumentation.action(f"load {tabTitle} tab"):
+                self.TAB_LOADERS[tab](self.testId)
+            self._staleTabs.discard(tab)
+            self._tabTestIds[tab] = self.testId
+        self._setTabBusy(tab, False)
+        QtCore.QTimer.singleShot(0, self._loadNextTab)
+
+    def on_tabChanged(self, index: int):
+        tab = self.tab_5.widget(index)
+        # tabs are only loaded once the test itself is, see on_testLoaded
+        isTestLoaded = self.testModel is not None and self.testModel.testData["_id"] == self.testId
+        if isTestLoaded and tab in self._staleTabs and tab not in self._pendingTabs:
+            self._setTabBusy(tab, True)
+            self._pendingTabs.append(tab)
+            QtCore.QTimer.singleShot(0, self._loadNextTab)
+
+    def _setTabBusy(self, tab: QtWidgets.QWidget, busy: bool):
+        index = self.tab_5.indexOf(tab)
+        title = self.tab_5.tabText(index).removesuffix(self.LOADING_SUFFIX)
+        self.tab_5.setTabText(index, title + self.LOADING_SUFFIX if busy else title)
+        tab.setEnabled(not busy)
+
     # ------------------------------ CALLBACKS ------------------------------ #
 
-    def _getGenericCallBack(self, widget: QtWidgets.QWidget, mapKeyList: list[str]):
-        def _genericCallback():
-            match widget:
-                case QtWidgets.QLineEdit():
-                    value = utils.removeWhitespace(widget.text())
-                case QtWidgets.QComboBox():
-                    value = widget.currentData()
-                case QtWidgets.QSpinBox():
-                    value = widget.value()
-                case QtWidgets.QTextEdit():
-                    value = widget.toPlainText() if widget.toPlainText() != "" else None
-                case QtWidgets.QListWidget():
-                    pass  # No signal for data changes, will be handle manually with buttons
-                case QtWidgets.QCheckBox():
-                    value = widget.isChecked()
-                case _:
-                    raise NotImplementedError
-            self.testModel.setData(mapKeyList, value)
-
-        return _genericCallback
+    def _onWidgetEdited(self, mapKeyList: list[str], value: Any):
+        self.testModel.setData(mapKeyList, value)
+        self.updateUndoActions()
 
     def on_editPBClicked(self):
         self.enableWidgets(True)
-        self.savePB.setEnabled(True)
-        self.cancelPB.setEnabled(True)
-        self.editPB.setEnabled(False)
+        self.setEditing(True)
+
+    def on_undoTriggered(self):
+        # a pending text edit becomes the last undoable edit
+        self.bindingEngine.flush()
+        if self.testModel.undo():
+            self.refresh()
+        self.updateUndoActions()
+
+    def on_redoTriggered(self):
+        self.bindingEngine.flush()
+        if self.testModel.redo():
+            self.refresh()
+        self.updateUndoActions()
 
     def on_cancelPBClicked(self):
+        self.bindingEngine.discardPending()
         self.enableWidgets(False)
-        self.testModel.refresh()
+        # edits are dropped locally, no database round trip
+        self.testModel.revert()
         self.refresh()
-        self.savePB.setEnabled(False)
-        self.cancelPB.setEnabled(False)
-        self.editPB.setEnabled(True)
+        self.setEditing(False)
 
     def on_savePBClicked(self):
-        saved = self.testModel.saveData()
+        self.saveTest()
+
+    def saveTest(self, force: bool = False):
+        self.bindingEngine.flush()
+        try:
+            with dbInstrumentation.action("on_savePBClicked"):
+                saved = self.testModel.saveData(force=force)
+        except SaveConflictError:
+            self.resolveSaveConflict()
+            return
         if saved:
+            usageStats.record(self.testId, str(self.testModel), "save")
+            self.testLabel.setText(str(self.testModel))
             self.enableWidgets(False)
-            self.savePB.setEnabled(False)
-            self.cancelPB.setEnabled(False)
-            self.editPB.setEnabled(True)
+            self.setEditing(False)
         else:
             QtWidgets.QMessageBox.warning(
                 self, "Failed", "Test Info not saved. Please check log."
             )
 
+    def resolveSaveConflict(self):
+        answer = QtWidgets.QMessageBox.warning(
+            self,
+            "Conflict",
+            "Test saved by someone else since it was loaded.\n"
+            "Save to overwrite their changes, Discard to reload the test without your edits.",
+            QtWidgets.QMessageBox.StandardButton.Save
+            | QtWidgets.QMessageBox.StandardButton.Discard
+            | QtWidgets.QMessageBox.StandardButton.Cancel,
+            QtWidgets.QMessageBox.StandardButton.Cancel,
+        )
+        match answer:
+            case QtWidgets.QMessageBox.StandardButton.Save:
+                self.saveTest(force=True)
+            case QtWidgets.QMessageBox.StandardButton.Discard:
+                self.on_cancelPBClicked()
+                self.loadTest(self.testId, revalidate=True)
+
     def on_reportTemplatesSelectionChanged(self):
         self.removeReportTemplatePB.setEnabled(
             len(self.reportTemplatesListWidget.selectedItems()) > 0
@@ -289,9 +606,22 @@ class TestWindow(Ui_TestGUI, MainWindow):
         )
 
     def on_actionTracksGUITriggered(self):
+        # heavy, only imported on first use
+        from main.scripts.gui.tracks_gui.tracks_gui import TracksViewDialog
+
         trackView = TracksViewDialog()
         trackView.exec()
 
+    def on_dumpDbTraceTriggered(self):
+        filePath, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Dump DB Trace", "test_gui_trace.json", "Trace files (*.json)"
+        )
+        if filePath:
+            dbInstrumentation.dumpTrace(filePath)
+
+    def on_measurePayloadToggled(self, checked: bool):
+        dbInstrumentation.measurePayload = checked
+
     def on_addReportTemplatePBClicked(self):
         self.addFilePathTemplate("Report", TEMPLATE_FORMAT.WORD, ["reportFilePathList"])
         self.refresh()
@@ -316,30 +646,36 @@ class TestWindow(Ui_TestGUI, MainWindow):
 
     # ------------------------------ UPDATE ------------------------------ #
     def refresh(self):
-        for widget, keyMap in self.WIDGET_DATABASE_MAPKEYLISTS_MAPPING.items():
-            value = self.testModel.getData(keyMap)
-            match widget:
-                case QtWidgets.QLineEdit() | QtWidgets.QTextEdit():
-                    widget.setText(value if value is not None else "")
-                case QtWidgets.QComboBox():
-                    for index in range(
-                        widget.count()
-                    ):  # findData method not working...
-                        if widget.itemText(index) == value:
-                            widget.setCurrentIndex(index)
-                            widget.setCurrentText(value)
-                            break
-                case QtWidgets.QSpinBox():
-                    if value:
-                        widget.setValue(value)
-                case QtWidgets.QListWidget():
-                    widget.clear()
-                    if value:
-                        widget.addItems(value)
-                case QtWidgets.QCheckBox():
-                    widget.setChecked(value)
-                case _:
-                    raise NotImplementedError
+        self.bindingEngine.push(self.testModel.getData)
+        self.flagTemplates()
+
+    def flagTemplates(self):
+        if self.testModel is None:
+            return
+        lastUpdateDate = self.testModel.testData.get("lastUpdateDate")
+        for listWidget in [self.reportTemplatesListWidget, self.debriefTemplatesListWidget]:
+            for row in range(listWidget.count()):
+                item = listWidget.item(row)
+                status = templateCatalog.status(item.text(), since=lastUpdateDate)
+                match status:
+                    case TEMPLATE_STATUS.MISSING:
+                        item.setForeground(QtGui.QColor("red"))
+                    case TEMPLATE_STATUS.CHANGED:
+                        item.setForeground(QtGui.QColor("darkorange"))
+                    case _:
+                        item.setForeground(listWidget.palette().text())
+                item.setToolTip(status.value if status is not TEMPLATE_STATUS.UNKNOWN else "")
+
+    def setEditing(self, editing: bool):
+        self.editing = editing
+        self.savePB.setEnabled(editing)
+        self.cancelPB.setEnabled(editing)
+        self.editPB.setEnabled(not editing)
+        self.updateUndoActions()
+
+    def updateUndoActions(self):
+        self.undoAction.setEnabled(self.editing and self.testModel.canUndo())
+        self.redoAction.setEnabled(self.editing and self.testModel.canRedo())
 
     def enableWidgets(self, enable: bool = True):
         for widget in [
@@ -359,12 +695,13 @@ class TestWindow(Ui_TestGUI, MainWindow):
     def addFilePathTemplate(
         self, category: str, docType: TEMPLATE_FORMAT, dbKeyMap: list[str]
     ):
-        _filepath = QtWidgets.QFileDialog.getOpenFileName(
-            self, f"Choose {category} Template", "C:\\", docType.value
-        )
-        if _filepath:
+        picker = TemplatePickerDialog(self, docType, f"Choose {category} Template")
+        accepted = picker.exec() == QtWidgets.QDialog.DialogCode.Accepted
+        selectedPath = picker.selectedPath
+        picker.deleteLater()
+        if accepted:
             try:
-                filepath = Path(_filepath[0]).relative_to(Path.cwd()).as_posix()
+                filepath = selectedPath.resolve().relative_to(Path.cwd().resolve()).as_posix()
             except ValueError:
                 QtWidgets.QMessageBox.warning(
                     self, "Failed", f"Template must be in {Path.cwd()} folder."
@@ -373,16 +710,34 @@ class TestWindow(Ui_TestGUI, MainWindow):
                 oldFilePathList = self.testModel.getData(dbKeyMap)
                 if oldFilePathList is None:
                     oldFilePathList = []
-                self.testModel.setData(dbKeyMap, oldFilePathList + [filepath])
+                self._onWidgetEdited(dbKeyMap, oldFilePathList + [filepath])
 
     def removeFilePathTemplate(self, value: str, dbKeyMap: list[str]):
         oldFilePathList = self.testModel.getData(dbKeyMap)
         newFilePathList = [_ for _ in oldFilePathList if _ != value]
-        self.testModel.setData(dbKeyMap, newFilePathList)
+        self._onWidgetEdited(dbKeyMap, newFilePathList)
 
 
-if __name__ == "__main__":
+def main() -> int:
     app = MainApp()
-    window = TestWindow()
+    dbInstrumentation.install()
+    usageStats.enable()
+    templateCatalog.start()
+    if mainDB.IS_READ_ONLY:
+        # read from the local snapshot right away, brought up to date in background
+        localSnapshot.enable()
+        snapshotRefresher = Worker(localSnapshot.refresh)
+        snapshotRefresher.signals.finished.connect(lambda changes: testCache.invalidateMany(changes["tests"]))
+        snapshotRefresher.signals.failed.connect(lambda error: logging.warning(f"Local snapshot not refreshed: {error}"))
+        snapshotRefresher.start()
+    # test picker first, the main window is only built once a test is chosen
+    askTestDialog = AskTestDialog(None)
+    if askTestDialog.exec() != QtWidgets.QDialog.DialogCode.Accepted:
+        return 1
+    window = TestWindow(testId=askTestDialog.selectedTestId)
     window.showNormal()
-    sys.exit(app.exec())
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+from copy import deepcopy
+from datetime import datetime
+from contextlib import contextmanager
+from collections import Counter
+from typing import Iterator, Optional
+from unittest import mock
+
 from bson import ObjectId
 
+from main.lib.database import mainDB
+from main.scripts.gui.test_gui.test_cache import testCache
 from constants.versions import Version
 
 
 def testFromTuple(name: str, typeName: str, version: Version, wins: list[ObjectId]) -> ObjectId:
     return {"_id": ObjectId(), "name": name, "objectType": typeName, "version": version,
-            "winDescriptionIdList": wins}
+            "winDescriptionIdList": wins, "stageDescriptionIdList": [], "scoreDescriptionIdList": [],
+            "active": True, "comment": None, "reportFilePathList": [], "debriefFilePathList": []}
 
 
 def patchDB(
@@ -18,3 +28,110 @@ def patchDB(
                                            for i in wins]) for *data, wins in tests]
 
     return winDescriptions, tests
+
+
+def _matches(value: object, condition: object) -> bool:
+    if isinstance(condition, dict) and "$in" in condition:
+        return value in condition["$in"]
+    return value == condition
+
+
+class FakeCollection:
+    """In memory stand-in of a mainDB collection recording every call.
+
+    get supports _id, equality and $in filters on top level keys and projections, documents are
+    handed out as copies as the database would.
+    """
+
+    def __init__(self, documents: list[dict]) -> None:
+        self.documents: dict[ObjectId, dict] = {
+            document["_id"]: {"lastUpdateDate": datetime(2024, 1, 1), **deepcopy(document)} for document in documents
+        }
+        # (method, kwargs) of every call
+        self.calls: list[tuple[str, dict]] = []
+
+    def _record(self, method: str, **kwargs):
+        self.calls.append((method, kwargs))
+
+    def callCount(self, method: Optional[str] = None) -> int:
+        return len(self.calls) if method is None else Counter(method for method, _ in self.calls)[method]
+
+    def resetCalls(self):
+        self.calls.clear()
+
+    def _project(self, document: dict, projection: Optional[dict]) -> dict:
+        if projection is None:
+            return deepcopy(document)
+        return {key: deepcopy(value) for key, value in document.items() if key == "_id" or projection.get(key)}
+
+    def get(self, id: Optional[ObjectId] = None, projection: Optional[dict] = None, **filters) -> list[dict]:
+        self._record("get", id=id, projection=projection, **filters)
+        documents = self.documents.values() if id is None else [self.documents[id]] if id in self.documents else []
+        return [
+            self._project(document, projection)
+            for document in documents
+            if all(_matches(document.get(key), value) for key, value in filters.items())
+        ]
+
+    def update(self, id: ObjectId, updateDict: dict) -> bool:
+        self._record("update", id=id, updateDict=updateDict)
+        if id not in self.documents:
+            return False
+        self.documents[id].update(deepcopy(updateDict))
+        self.documents[id]["lastUpdateDate"] = datetime.now()
+        return True
+
+    def create(self, **kwargs) -> ObjectId:
+        self._record("create", **kwargs)
+        document = dict(deepcopy(kwargs), _id=ObjectId(), creationDate=datetime.now(), lastUpdateDate=datetime.now())
+        self.documents[document["_id"]] = document
+        return document["_id"]
+
+    def duplicateFrom(self, testId: ObjectId) -> ObjectId:
+        self._record("duplicateFrom", testId=testId)
+        document = dict(deepcopy(self.documents[testId]), _id=ObjectId(), lastUpdateDate=datetime.now())
+        self.documents[document["_id"]] = document
+        return document["_id"]
+
+    def getOrderedList(self, mostUsedTests: list[str]) -> list[dict]:
+        """Tests as {_id, name, version}, the most used names first then by name."""
+        self._record("getOrderedList", mostUsedTests=mostUsedTests)
+        rank = {name: i for i, name in enumerate(mostUsedTests)}
+        documents = sorted(
+            self.documents.values(), key=lambda document: (rank.get(document["name"], len(rank)), document["name"])
+        )
+        return [self._project(document, {"name": True, "version": True}) for document in documents]
+
+
+class FakeMainDB:
+    def __init__(self, winDescriptions: list[dict], tests: list[dict]) -> None:
+        self.windescriptions = FakeCollection(winDescriptions)
+        self.tests = FakeCollection(tests)
+
+    def callCount(self) -> int:
+        return self.tests.callCount() + self.windescriptions.callCount()
+
+    def resetCalls(self):
+        self.tests.resetCalls()
+        self.windescriptions.resetCalls()
+
+    @contextmanager
+    def assertMaxQueries(self, maxQueries: int) -> Iterator[None]:
+        """Fail if the block makes more than maxQueries calls."""
+        start = self.callCount()
+        yield
+        nbQueries = self.callCount() - start
+        assert nbQueries <= maxQueries, f"{nbQueries} queries made, budget is {maxQueries}"
+
+
+@contextmanager
+def patchMainDB(winDescriptions: list[dict], tests: list[dict]) -> Iterator[FakeMainDB]:
+    """Replace mainDB tests and windescriptions collections by fakes seeded with patchDB output."""
+    fakeDB = FakeMainDB(winDescriptions, tests)
+    # a warm cache would hide queries
+    testCache.clear()
+    with mock.patch.object(mainDB, "tests", fakeDB.tests), mock.patch.object(
+        mainDB, "windescriptions", fakeDB.windescriptions
+    ):
+        yield fakeDB
+    testCache.clear()
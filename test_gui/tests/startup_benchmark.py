@@ -0,0 +1,132 @@
+"""Startup benchmark of test_gui.py.
+
+Measures, in fresh interpreters running on the offscreen Qt platform:
+    - the import time breakdown of the test_gui module (python -X importtime)
+    - the time from interpreter start to the first paint of the test picker
+
+"cold" runs use an empty bytecode cache, "warm" runs reuse the one filled by the
+first cold run. Exits with 1 if the warm median exceeds --max-ms.
+
+    python startup_benchmark.py --runs 5 --max-ms 3000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+MODULE = "main.scripts.gui.test_gui.test_gui"
+
+# Child process: import the GUI module, open the picker and report when it is first painted
+FIRST_PAINT_SCRIPT = """
+import sys, time, json
+startTime = float(sys.argv[1])
+from PySide6 import QtCore
+import {module} as test_gui
+importTime = time.time()
+
+
+class PaintFilter(QtCore.QObject):
+    def eventFilter(self, watched, event):
+        if event.type() == QtCore.QEvent.Type.Paint:
+            paintTime = time.time()
+            print(json.dumps({{"importMs": (importTime - startTime) * 1000,
+                              "firstPaintMs": (paintTime - startTime) * 1000}}))
+            QtCore.QCoreApplication.exit(0)
+        return False
+
+
+app = test_gui.MainApp()
+askTestDialog = test_gui.AskTestDialog(None)
+paintFilter = PaintFilter()
+askTestDialog.installEventFilter(paintFilter)
+askTestDialog.show()
+sys.exit(app.exec())
+"""
+
+
+def _env(pycachePrefix: str) -> dict:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONPYCACHEPREFIX=pycachePrefix)
+    return env
+
+
+def measureFirstPaint(pycachePrefix: str) -> dict:
+    startTime = time.time()
+    output = subprocess.run(
+        [sys.executable, "-c", FIRST_PAINT_SCRIPT.format(module=MODULE), str(startTime)],
+        env=_env(pycachePrefix),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def measureImportTime(pycachePrefix: str, top: int) -> list[tuple[str, float]]:
+    """Return the top cumulative import times in ms, as (module, ms)."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        env=_env(pycachePrefix),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # children are listed before their parent, indented by 2 spaces per level
+    imports, children = [], []
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level == 0:
+            if name.strip() == MODULE:
+                imports = children + [(MODULE, int(cumulative) / 1000)]
+            children = []
+        elif level == 1:
+            children.append((name.strip(), int(cumulative) / 1000))
+    return sorted(imports, key=lambda _: _[1], reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="number of warm runs")
+    parser.add_argument("--top", type=int, default=15, help="number of imports shown in the breakdown")
+    parser.add_argument("--max-ms", type=float, default=None, help="warm time to first paint threshold")
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pycachePrefix:
+        cold = measureFirstPaint(pycachePrefix)
+        warm = [measureFirstPaint(pycachePrefix) for _ in range(args.runs)]
+        imports = measureImportTime(pycachePrefix, args.top)
+
+    results = {
+        "cold": cold,
+        "warm": {
+            key: statistics.median(run[key] for run in warm) for key in ["importMs", "firstPaintMs"]
+        },
+        "imports": imports,
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'':<6}{'import (ms)':>14}{'first paint (ms)':>20}")
+        for name in ["cold", "warm"]:
+            print(f"{name:<6}{results[name]['importMs']:>14.0f}{results[name]['firstPaintMs']:>20.0f}")
+        print("\nImport breakdown (warm, cumulative ms):")
+        for name, ms in imports:
+            print(f"  {name:<50}{ms:>10.1f}")
+
+    if args.max_ms is not None and results["warm"]["firstPaintMs"] > args.max_ms:
+        print(f"Warm startup {results['warm']['firstPaintMs']:.0f} ms exceeds {args.max_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Scaling benchmarks of the test GUI models, on catalogs synthesized with fake_db.patchDB.
+
+Only the smallest size runs in a plain pytest session, all sizes run with --benchmark-only.
+
+Store a baseline (in .benchmarks/):
+    pytest tests/test_benchmarks.py --benchmark-only --benchmark-autosave
+Compare against the last stored baseline, failing on a mean regression over 20%:
+    pytest tests/test_benchmarks.py --benchmark-only --benchmark-compare --benchmark-compare-fail=mean:20%
+"""
+
+from __future__ import annotations
+
+import pytest
+from unittest import mock
+from functools import lru_cache
+from random import Random
+
+from PySide6.QtCore import QModelIndex
+
+pytest.importorskip("pytest_benchmark")
+
+from main.lib.database import mainDB  # noqa: E402
+from main.scripts.gui.test_gui.wins_tab_widget import AllWinsItemModel  # noqa: E402
+from main.scripts.gui.test_gui.wins_tab_widget import WinRegistry, TestWinsItemModel  # noqa: E402
+from main.scripts.gui.test_gui.test_gui import TestModel, TestWindow  # noqa: E402
+from main.scripts.gui.test_gui.test_cache import testCache  # noqa: E402
+from fake_db import patchDB  # noqa: E402
+from utils import generateRandomCode  # noqa: E402
+from constants.versions import Version  # noqa: E402
+
+OBJECT_TYPES = mainDB.objects.OBJECT_TYPE_LIST
+SIZES = [1_000, 10_000, 100_000]
+WINS_PER_TEST = 10
+
+
+@lru_cache
+def _codes(nbWins: int) -> list[tuple[str, ...]]:
+    return generateRandomCode(nbWins)
+
+
+def _catalog(nbWins: int) -> tuple[list[dict], list[dict]]:
+    """nbWins win descriptions, and one test per 50 wins each using WINS_PER_TEST of them."""
+    random = Random(0)
+    tests = [
+        (f"Test{i}", OBJECT_TYPES[i % len(OBJECT_TYPES)], Version(1, 0), random.sample(range(nbWins), WINS_PER_TEST))
+        for i in range(max(1, nbWins // 50))
+    ]
+    winDescriptions, tests = patchDB(_codes(nbWins), tests)
+    # long template lists, converted by TestModel.getData
+    tests[0]["reportFilePathList"] = [f"templates/report_{i}.docx" for i in range(nbWins // 10)]
+    return winDescriptions, tests
+
+
+def _traverse(model, parent: QModelIndex = QModelIndex()) -> int:
+    """Call data() on every index of the model, return the number of visited indexes."""
+    count = 0
+    for row in range(model.rowCount(parent)):
+        for column in range(model.columnCount(parent)):
+            model.data(model.index(row, column, parent))
+            count += 1
+        count += _traverse(model, model.index(row, 0, parent))
+    return count
+
+
+@pytest.fixture(params=SIZES, ids=lambda size: f"{size}wins")
+def size(request):
+    if request.param > SIZES[0] and not request.config.getoption("benchmark_only"):
+        pytest.skip("large catalogs only run with --benchmark-only")
+    return request.param
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+@mock.patch("main.lib.database.mainDB.windescriptions.get")
+def test_benchWinRegistryInit(mock_windescriptions_get, mock_tests_get, benchmark, size):
+    mock_windescriptions_get.return_value, mock_tests_get.return_value = _catalog(size)
+
+    registry = benchmark.pedantic(WinRegistry, rounds=3)
+    assert len(registry.getDbWins()) > 0
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+@mock.patch("main.lib.database.mainDB.windescriptions.get")
+def test_benchWinRegistryDiff(mock_windescriptions_get, mock_tests_get, benchmark, size):
+    mock_windescriptions_get.return_value, mock_tests_get.return_value = _catalog(size)
+    registry = WinRegistry()
+    for code in generateRandomCode(10):
+        registry.createWin(code)
+
+    def diff():
+        return (
+            registry.needSave(),
+            registry.getAddedWinsCodes(),
+            registry.getDeletedWinsCodes(),
+            registry.getUpdatedWinsCodes(),
+        )
+
+    needSave, *_ = benchmark(diff)
+    assert needSave is True
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+@mock.patch("main.lib.database.mainDB.windescriptions.get")
+def test_benchAllWinsItemModel(mock_windescriptions_get, mock_tests_get, benchmark, size):
+    mock_windescriptions_get.return_value, mock_tests_get.return_value = _catalog(size)
+    registry = WinRegistry()
+
+    def buildAndTraverse():
+        return _traverse(AllWinsItemModel(registry))
+
+    assert benchmark.pedantic(buildAndTraverse, rounds=3) > 0
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+@mock.patch("main.lib.database.mainDB.windescriptions.get")
+def test_benchTestWinsItemModel(mock_windescriptions_get, mock_tests_get, benchmark, size):
+    winDescriptions, tests = _catalog(size)
+    mock_windescriptions_get.return_value, mock_tests_get.return_value = winDescriptions, tests
+    registry = WinRegistry()
+
+    def buildAndTraverse():
+        return _traverse(TestWinsItemModel(tests[0]["_id"], registry))
+
+    assert benchmark.pedantic(buildAndTraverse, rounds=3) > 0
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_benchTestModelGetData(mock_tests_get, benchmark, size):
+    _, mock_tests_get.return_value = _catalog(size)
+    testCache.clear()
+    model = TestModel(mock_tests_get.return_value[0]["_id"])
+
+    def getAll():
+        return [model.getData(mapList) for mapList in [["name"], ["version", "major"], ["reportFilePathList"]]]
+
+    assert len(benchmark(getAll)[2]) == size // 10
+
+
+@mock.patch("main.lib.database.mainDB.tests.update")
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_benchTestModelSaveData(mock_tests_get, mock_tests_update, benchmark, size):
+    _, mock_tests_get.return_value = _catalog(size)
+    mock_tests_update.return_value = True
+    testCache.clear()
+    model = TestModel(mock_tests_get.return_value[0]["_id"])
+
+    def editAndSave():
+        model.setData(["active"], not model.getData(["active"]))
+        return model.saveData()
+
+    assert benchmark(editAndSave) is True
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_benchTestWindowRefresh(mock_tests_get, benchmark, size, qtbot):
+    _, mock_tests_get.return_value = _catalog(size)
+    testCache.clear()
+    testId = mock_tests_get.return_value[0]["_id"]
+    window = TestWindow(testId=testId)
+    qtbot.addWidget(window)
+    qtbot.waitUntil(lambda: window.testModel is not None)
+
+    benchmark(window.refresh)
+    assert window.reportTemplatesListWidget.count() == size // 10
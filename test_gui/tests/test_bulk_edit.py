@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from main.lib.database import mainDB
+from main.scripts.gui.test_gui.bulk_edit import BulkEdit
+from fake_db import patchDB
+from constants.versions import Version
+
+OBJECT_TYPES = mainDB.objects.OBJECT_TYPE_LIST
+
+
+@mock.patch("main.lib.database.mainDB.tests.update")
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_bulkEditPreviewAndApply(mock_tests_get, mock_tests_update):
+    _, tests = patchDB([], [
+        ("Test", OBJECT_TYPES[0], Version(1, 0), []),
+        ("Other", OBJECT_TYPES[0], Version(1, 0), []),
+        ("Not Selected", OBJECT_TYPES[0], Version(1, 0), []),
+    ])
+    tests[1]["active"] = False
+    mock_tests_get.return_value = tests
+    mock_tests_update.return_value = True
+
+    bulkEdit = BulkEdit([tests[0]["_id"], tests[1]["_id"]], ["active"], False)
+    changes = bulkEdit.preview()
+
+    # dry run: a single projected query, nothing written
+    assert mock_tests_get.call_count == 1
+    assert "projection" in mock_tests_get.call_args.kwargs
+    assert mock_tests_get.call_args.kwargs["_id"] == {"$in": [tests[0]["_id"], tests[1]["_id"]]}
+    mock_tests_update.assert_not_called()
+    assert [(change.oldValue, change.changed) for change in changes] == [(True, True), (False, False)]
+
+    assert bulkEdit.apply(changes) == []
+    mock_tests_update.assert_called_once_with(tests[0]["_id"], {"active": False})
+
+
+@mock.patch("main.lib.database.mainDB.tests.update")
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_bulkEditApplyFailures(mock_tests_get, mock_tests_update):
+    _, tests = patchDB([], [
+        ("Test", OBJECT_TYPES[0], Version(1, 0), []),
+        ("Other", OBJECT_TYPES[0], Version(1, 0), []),
+    ])
+    mock_tests_get.return_value = tests
+    mock_tests_update.side_effect = [RuntimeError("write failed"), True]
+
+    bulkEdit = BulkEdit([test["_id"] for test in tests], ["objectType"], OBJECT_TYPES[1])
+
+    # a failing test does not stop the others
+    assert bulkEdit.apply(bulkEdit.preview()) == [tests[0]["_id"]]
+    assert mock_tests_update.call_count == 2
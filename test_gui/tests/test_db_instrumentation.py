@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import threading
+from unittest import mock
+
+from main.lib.database import mainDB
+from main.scripts.gui.test_gui.db_instrumentation import DbInstrumentation, dbInstrumentation
+from main.scripts.gui.test_gui.workers import Worker
+from fake_db import patchDB
+from constants.versions import Version
+
+OBJECT_TYPES = mainDB.objects.OBJECT_TYPE_LIST
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_dbInstrumentation(mock_tests_get, tmp_path):
+    _, tests = patchDB([], [("Test", OBJECT_TYPES[0], Version(1, 0), [])])
+    mock_tests_get.return_value = tests
+
+    instrumentation = DbInstrumentation(measurePayload=True)
+    summaries = []
+    instrumentation.summaryChanged.connect(summaries.append)
+    instrumentation.install()
+    try:
+        instrumentation.install()  # idempotent
+        with instrumentation.action("initTest") as action:
+            mainDB.tests.get(id=tests[0]["_id"])
+            mainDB.tests.get(id=tests[0]["_id"])
+        mainDB.tests.get(id=tests[0]["_id"])  # outside of any action
+        assert mainDB.objects.OBJECT_TYPE_LIST == OBJECT_TYPES
+    finally:
+        instrumentation.uninstall()
+
+    assert mainDB.tests.get is mock_tests_get
+    assert action.nbCalls == 2
+    # Version included, the whole document is sized
+    assert action.payloadSize > 2 * 200
+    assert summaries[-1].startswith("initTest: 2 queries")
+    assert sum(instrumentation.histogram("initTest").values()) == 1
+
+    tracePath = tmp_path / "trace.json"
+    instrumentation.dumpTrace(tracePath)
+    events = json.loads(tracePath.read_text())["traceEvents"]
+    assert [event["name"] for event in events] == ["tests.get", "tests.get", "initTest", "tests.get"]
+    assert events[-1]["args"]["action"] == "(no action)"
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_dbInstrumentationThreads(mock_tests_get, qtbot):
+    mock_tests_get.return_value = []
+    dbInstrumentation.install()
+    try:
+        with dbInstrumentation.action("save") as action:
+            # background calls of another thread are not part of the action
+            thread = threading.Thread(target=mainDB.tests.get)
+            thread.start()
+            thread.join()
+            assert action.nbCalls == 0
+            # unless made by a worker created during the action
+            worker = Worker(mainDB.tests.get)
+            with qtbot.waitSignal(worker.signals.finished):
+                worker.start()
+            assert action.nbCalls == 1
+        assert action.payloadSize == 0  # not measured by default
+    finally:
+        dbInstrumentation.uninstall()
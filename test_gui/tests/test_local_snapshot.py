@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import pickle
+import sqlite3
+from pathlib import Path
+from unittest import mock
+from datetime import datetime
+
+from main.lib.database import mainDB
+from main.scripts.gui.test_gui.local_snapshot import LocalSnapshot
+from fake_db import patchDB
+from constants.versions import Version
+
+OBJECT_TYPES = mainDB.objects.OBJECT_TYPE_LIST
+
+
+def _projection(documents: list[dict]) -> list[dict]:
+    return [{"_id": document["_id"], "lastUpdateDate": document.get("lastUpdateDate")} for document in documents]
+
+
+def _fakeGet(documents: list[dict]):
+    def get(id=None, projection=None):
+        selected = [document for document in documents if id is None or document["_id"] == id]
+        return _projection(selected) if projection is not None else selected
+
+    return get
+
+
+@mock.patch("main.lib.database.mainDB.tests.getOrderedList")
+@mock.patch("main.lib.database.mainDB.windescriptions.get")
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_localSnapshotRefresh(mock_tests_get, mock_windescriptions_get, mock_tests_getOrderedList, tmp_path):
+    _, tests = patchDB(
+        [("A", "B")],
+        [("Test", OBJECT_TYPES[0], Version(1, 0), [0]), ("Other", OBJECT_TYPES[0], Version(2, 0), [])],
+    )
+    for test in tests:
+        test["lastUpdateDate"] = datetime(2024, 1, 1)
+    tests[0]["reportFilePathList"] = [Path("templates/report.docx")]
+    mock_tests_get.side_effect = _fakeGet(tests)
+    mock_tests_getOrderedList.return_value = [{"_id": test["_id"], "name": test["name"]} for test in tests]
+
+    snapshot = LocalSnapshot(tmp_path / "snapshot.sqlite3")
+    changes = snapshot.refresh()
+    assert len(changes["tests"]) == 2
+    assert snapshot.getDocument("tests", tests[0]["_id"]) == tests[0]
+    mock_windescriptions_get.assert_not_called()
+    assert snapshot.getMeta("objectTypes") == list(OBJECT_TYPES)
+    snapshot.close()
+
+    # reopened: only the updated test is fetched, the removed one is dropped
+    tests[0] = dict(tests[0], name="Renamed", lastUpdateDate=datetime(2024, 1, 2))
+    removedTest = tests.pop(1)
+    mock_tests_get.reset_mock()
+    snapshot = LocalSnapshot(tmp_path / "snapshot.sqlite3")
+    changes = snapshot.refresh()
+
+    assert set(changes["tests"]) == {tests[0]["_id"], removedTest["_id"]}
+    assert mock_tests_get.call_count == 2  # lastUpdateDate projection, then the updated test
+    assert snapshot.getDocument("tests", tests[0]["_id"])["name"] == "Renamed"
+    assert snapshot.getDocument("tests", removedTest["_id"]) is None
+    snapshot.close()
+
+
+def test_localSnapshotDropsOldFormat(tmp_path):
+    # pickled snapshot of a previous version, never unpickled
+    path = tmp_path / "snapshot.sqlite3"
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+    connection.execute("INSERT INTO meta VALUES (?, ?)", ("objectTypes", pickle.dumps(["A"])))
+    connection.commit()
+    connection.close()
+
+    snapshot = LocalSnapshot(path)
+    assert snapshot.getMeta("objectTypes") is None
+    snapshot.close()
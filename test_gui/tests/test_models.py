@@ -1,9 +1,14 @@
 from unittest import mock
+from pathlib import Path
+from bson import ObjectId
+from PySide6 import QtCore, QtWidgets
 from random import randint, seed
 from main.lib.database import mainDB
 from main.scripts.gui.test_gui.wins_tab_widget import AllWinsItemModel
 from main.scripts.gui.test_gui.wins_tab_widget import WinRegistry, TestWinsItemModel
-from fake_db import patchDB
+from main.scripts.gui.test_gui.test_gui import TestModel, TestWindow
+from main.scripts.gui.test_gui.ask_test_gui import TestListModel
+from fake_db import patchDB, patchMainDB
 from utils import generateRandomCode
 from constants.versions import Version
 
@@ -11,6 +16,10 @@ OBJECT_TYPES = mainDB.objects.OBJECT_TYPE_LIST
 seed(0)
 
 
+def _testList(nbTests: int):
+    return patchDB([], [(f"Test{i:03d}", OBJECT_TYPES[0], Version(1, 0), []) for i in range(nbTests)])
+
+
 @mock.patch("main.lib.database.mainDB.tests.get")
 @mock.patch("main.lib.database.mainDB.windescriptions.get")
 def test_allWinsItemModelEmptyDb(mock_windescriptions_get, mock_tests_get, qtmodeltester):
@@ -44,3 +53,226 @@ def test_testWinsItemModel(mock_windescriptions_get, mock_tests_get, qtmodeltest
     model = TestWinsItemModel(tests[0]["_id"], WinRegistry())
 
     qtmodeltester.check(model, force_py=True)
+
+
+@mock.patch("main.lib.database.mainDB.tests.update")
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_testModelSaveOnlyDirtyFields(mock_tests_get, mock_tests_update):
+    _, tests = patchDB([], [("Test", OBJECT_TYPES[0], Version(1, 0), [])])
+    mock_tests_get.return_value = tests
+    mock_tests_update.return_value = True
+
+    model = TestModel(tests[0]["_id"])
+    assert model.saveData() is True
+    mock_tests_update.assert_not_called()
+
+    model.setData(["name"], "Test")  # same value, not dirty
+    assert model.isDirty() is False
+
+    model.setData(["active"], False)
+    model.setData(["version", "minor"], 1)
+    assert model.saveData() is True
+    mock_tests_update.assert_called_once()
+    testId, updateDict = mock_tests_update.call_args.args
+    assert testId == tests[0]["_id"]
+    assert set(updateDict) == {"active", "version"}
+    assert updateDict["version"]["minor"] == 1
+    assert model.isDirty() is False
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_testModelUndoRedo(mock_tests_get):
+    _, tests = patchDB([], [("Test", OBJECT_TYPES[0], Version(1, 0), [])])
+    tests[0]["reportFilePathList"] = ["a.docx"]
+    mock_tests_get.return_value = tests
+
+    model = TestModel(tests[0]["_id"])
+    baseline = model.testData
+    model.setData(["name"], "Renamed")
+    model.setData(["version", "minor"], 1)
+    model.setData(["version", "minor"], 2)
+    assert str(model) == "Renamed - 1.2"
+    # edits are not applied to the baseline, untouched fields are shared
+    assert baseline["name"] == "Test" and baseline["version"]["minor"] == 0
+    assert model.testData["reportFilePathList"] is baseline["reportFilePathList"]
+
+    assert model.undo() and model.getData(["version", "minor"]) == 1
+    assert model.undo() and model.getData(["version", "minor"]) == 0
+    assert model.redo() and model.getData(["version", "minor"]) == 1
+    model.setData(["active"], False)  # a new edit drops the redo history
+    assert not model.canRedo()
+
+    while model.undo():
+        pass
+    assert not model.isDirty()
+
+    model.setData(["name"], "Renamed")
+    model.revert()  # no database round trip
+    assert str(model) == "Test - 1.0" and not model.canUndo()
+    assert mock_tests_get.call_count == 1
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_testModelQtView(mock_tests_get):
+    _, tests = patchDB([], [("Test", OBJECT_TYPES[0], Version(1, 0), [])])
+    tests[0]["reportFilePathList"] = [Path("templates/a.docx")]
+    mock_tests_get.return_value = tests
+
+    model = TestModel(tests[0]["_id"])
+    reportFilePathList = model.getData(["reportFilePathList"])
+    assert reportFilePathList == ["templates/a.docx"]
+    # converted once, until the field is edited
+    assert model.getData(["reportFilePathList"]) is reportFilePathList
+    model.setData(["name"], "Renamed")
+    assert model.getData(["reportFilePathList"]) is reportFilePathList
+
+    model.setData(["reportFilePathList"], reportFilePathList + ["b.docx"])
+    assert model.getData(["reportFilePathList"]) == ["templates/a.docx", "b.docx"]
+    model.undo()
+    assert model.getData(["reportFilePathList"]) == ["templates/a.docx"]
+    model.redo()
+    model.revert()
+    assert model.getData(["reportFilePathList"]) == ["templates/a.docx"]
+    assert model.getData(["name"]) == "Test"
+
+
+def _testWindow(qtbot, testId):
+    window = TestWindow(testId=testId)
+    qtbot.addWidget(window)
+    # the test is fetched once the event loop runs, tab loaders can still be replaced
+    window.TAB_LOADERS = {tab: mock.Mock() for tab in window.TAB_LOADERS}
+    return window
+
+
+def test_testWindowLoadsInBackground(qtbot):
+    _, tests = _testList(3)
+    with patchMainDB([], tests), mock.patch.object(TestWindow, "LAZY_TABS", False):
+        window = _testWindow(qtbot, tests[0]["_id"])
+        loaders = window.TAB_LOADERS
+        assert window.testModel is None and window.testLabel.text() == "Loading..."
+        assert not any(tab.isEnabled() for tab in loaders)
+
+        # General tab first, then every other tab
+        qtbot.waitUntil(lambda: all(loader.called for loader in loaders.values()))
+        assert window.testNameLE.text() == "Test000"
+        for tab, loader in loaders.items():
+            loader.assert_called_once_with(tests[0]["_id"])
+            assert tab.isEnabled()
+            assert not window.tab_5.tabText(window.tab_5.indexOf(tab)).endswith(TestWindow.LOADING_SUFFIX)
+
+        # the result of a superseded selection is ignored
+        window.loadTest(tests[1]["_id"])
+        window.loadTest(tests[2]["_id"])
+        qtbot.waitUntil(lambda: all(loader.call_args == mock.call(tests[2]["_id"]) for loader in loaders.values()))
+        QtCore.QThreadPool.globalInstance().waitForDone()
+        qtbot.wait(10)  # the superseded result is delivered
+        assert window.testNameLE.text() == "Test002"
+        assert all(mock.call(tests[1]["_id"]) not in loader.call_args_list for loader in loaders.values())
+
+        # a test picked again before it is loaded is shown once
+        window.loadTest(tests[1]["_id"])
+        window.loadTest(tests[1]["_id"])
+        QtCore.QThreadPool.globalInstance().waitForDone()
+        qtbot.waitUntil(lambda: all(loader.call_args == mock.call(tests[1]["_id"]) for loader in loaders.values()))
+        qtbot.wait(10)
+        assert all(loader.call_args_list.count(mock.call(tests[1]["_id"])) == 1 for loader in loaders.values())
+
+        # a failed load falls back on the test shown
+        with mock.patch.object(QtWidgets.QMessageBox, "warning") as mock_warning:
+            window.loadTest(ObjectId())
+            qtbot.waitUntil(lambda: mock_warning.called)
+        assert window.testId == tests[1]["_id"] and window.testLabel.text() == "Test001 - 1.0"
+        assert all(tab.isEnabled() for tab in loaders)
+
+
+def test_testWindowLazyTabs(qtbot):
+    _, tests = _testList(2)
+    with patchMainDB([], tests):
+        window = _testWindow(qtbot, tests[0]["_id"])
+        loaders = window.TAB_LOADERS
+        qtbot.waitUntil(lambda: window.testModel is not None)
+        qtbot.wait(10)
+        # only the General tab is shown
+        assert not any(loader.called for loader in loaders.values())
+        assert all(tab.isEnabled() for tab in loaders)
+
+        window.tab_5.setCurrentWidget(window.tab_2)
+        qtbot.waitUntil(lambda: loaders[window.tab_2].called)
+        loaders[window.tab_2].assert_called_once_with(tests[0]["_id"])
+
+        # the tab shown is loaded with the new test, the others on their next visit
+        window.loadTest(tests[1]["_id"])
+        qtbot.waitUntil(lambda: loaders[window.tab_2].call_count == 2)
+        assert loaders[window.tab_2].call_args == mock.call(tests[1]["_id"])
+        window.tab_5.setCurrentWidget(window.tab)
+        qtbot.waitUntil(lambda: loaders[window.tab].called)
+        loaders[window.tab].assert_called_once_with(tests[1]["_id"])
+
+        window.tab_5.setCurrentWidget(window.tab_2)
+        qtbot.wait(10)
+        assert loaders[window.tab_2].call_count == 2
+        assert not loaders[window.winsDescriptionEditor].called
+
+
+def test_testListModelPaging(qtbot, qtmodeltester):
+    _, tests = _testList(250)
+    with patchMainDB([], tests) as fakeDB:
+        model = TestListModel()
+        assert model.rowCount() == 0 and not model.canFetchMore(QtCore.QModelIndex())
+        qtbot.waitUntil(model.isLoaded)
+    assert model.rowCount() == TestListModel.PAGE_SIZE
+    assert model.data(model.index(0)) == "Test000 - 1.0"
+    assert model.data(model.index(0), QtCore.Qt.ItemDataRole.UserRole) == tests[0]["_id"]
+    qtmodeltester.check(model, force_py=True)
+
+    while model.canFetchMore(QtCore.QModelIndex()):
+        model.fetchMore(QtCore.QModelIndex())
+    assert model.rowCount() == 250
+    assert model.data(model.index(249)) == "Test249 - 1.0"
+    assert fakeDB.tests.callCount() == 1
+
+
+def test_testListModelFilter(qtbot, qtmodeltester):
+    _, tests = _testList(250)
+    with patchMainDB([], tests):
+        model = TestListModel()
+        qtbot.waitUntil(model.isLoaded)
+
+    # tests not fetched yet are filtered too
+    model.setFilterText("test2")
+    assert model.rowCount() == 50 and not model.canFetchMore(QtCore.QModelIndex())
+    qtmodeltester.check(model, force_py=True)
+    model.setFilterText(" TEST24")
+    assert [model.data(model.index(row)) for row in range(model.rowCount())] == [
+        f"Test24{i} - 1.0" for i in range(10)
+    ]
+    assert model.data(model.index(0), QtCore.Qt.ItemDataRole.UserRole) == tests[240]["_id"]
+    model.setFilterText("unknown")
+    assert model.rowCount() == 0
+    model.setFilterText("")
+    assert model.rowCount() == 250
+
+
+def test_testListModelCheckable(qtbot, qtmodeltester):
+    _, tests = _testList(250)
+    with patchMainDB([], tests):
+        model = TestListModel(checkable=True)
+        qtbot.waitUntil(model.isLoaded)
+    checkStateRole = QtCore.Qt.ItemDataRole.CheckStateRole
+    index = model.index(0)
+    assert model.flags(index) & QtCore.Qt.ItemFlag.ItemIsUserCheckable
+    assert model.data(index, checkStateRole) == QtCore.Qt.CheckState.Unchecked
+    assert model.setData(index, QtCore.Qt.CheckState.Checked.value, checkStateRole)
+    assert model.data(index, checkStateRole) == QtCore.Qt.CheckState.Checked
+    qtmodeltester.check(model, force_py=True)
+
+    # checked tests are kept across filter changes
+    model.setFilterText("test24")
+    model.setAllChecked(True)
+    model.setFilterText("")
+    assert model.checkedTestIds() == [tests[0]["_id"]] + [test["_id"] for test in tests[240:250]]
+    model.setFilterText("test249")
+    model.setAllChecked(False)
+    model.setFilterText("test000")
+    assert model.setData(model.index(0), QtCore.Qt.CheckState.Unchecked.value, checkStateRole)
+    assert model.checkedTestIds() == [test["_id"] for test in tests[240:249]]
@@ -0,0 +1,83 @@
+"""Number of mainDB queries made by the main code paths, against fake_db.FakeMainDB."""
+
+from __future__ import annotations
+
+from main.lib.database import mainDB
+from main.scripts.gui.test_gui.test_gui import TestModel
+from main.scripts.gui.test_gui.bulk_edit import BulkEdit
+from main.scripts.gui.test_gui.local_snapshot import LocalSnapshot
+from fake_db import patchDB, patchMainDB
+from utils import generateRandomCode
+from constants.versions import Version
+
+OBJECT_TYPES = mainDB.objects.OBJECT_TYPE_LIST
+
+
+def _catalog(nbTests: int = 20):
+    return patchDB(
+        generateRandomCode(50),
+        [(f"Test{i}", OBJECT_TYPES[0], Version(1, 0), [(i + k) % 50 for k in range(5)]) for i in range(nbTests)],
+    )
+
+
+def test_fakeMainDB():
+    winDescriptions, tests = _catalog()
+    with patchMainDB(winDescriptions, tests) as fakeDB:
+        assert len(mainDB.tests.get(name="Test1")) == 1
+        assert mainDB.tests.get(id=tests[0]["_id"], projection={"name": True})[0].keys() == {"_id", "name"}
+        assert mainDB.tests.getOrderedList(["Test3"])[0]["name"] == "Test3"
+        newTestId = mainDB.tests.duplicateFrom(tests[0]["_id"])
+        assert mainDB.tests.update(newTestId, {"name": "Copy"})
+        assert mainDB.tests.get(id=newTestId)[0]["name"] == "Copy"
+        assert fakeDB.tests.callCount("get") == 3
+    assert mainDB.tests is not fakeDB.tests
+
+
+def test_testModelQueryBudget():
+    winDescriptions, tests = _catalog()
+    with patchMainDB(winDescriptions, tests) as fakeDB:
+        with fakeDB.assertMaxQueries(1):
+            model = TestModel(tests[0]["_id"])
+        with fakeDB.assertMaxQueries(0):  # served by the test cache
+            TestModel(tests[0]["_id"])
+
+        model.setData(["active"], False)
+        model.setData(["comment"], "Comment")
+        # conflict check, update and server set fields, no full read
+        with fakeDB.assertMaxQueries(3):
+            assert model.saveData()
+        assert fakeDB.tests.callCount("update") == 1
+        assert model.testData["lastUpdateDate"] == fakeDB.tests.documents[tests[0]["_id"]]["lastUpdateDate"]
+        with fakeDB.assertMaxQueries(0):  # saved document cached
+            assert TestModel(tests[0]["_id"]).testData["comment"] == "Comment"
+
+        with fakeDB.assertMaxQueries(0):
+            model.revert()
+
+
+def test_bulkEditQueryBudget():
+    winDescriptions, tests = _catalog(50)
+    with patchMainDB(winDescriptions, tests) as fakeDB:
+        bulkEdit = BulkEdit([test["_id"] for test in tests[:10]], ["active"], False)
+        # independent of the number of tests, only the checked ones are read
+        with fakeDB.assertMaxQueries(1):
+            changes = bulkEdit.preview()
+        assert len(changes) == 10
+        fakeDB.resetCalls()
+        bulkEdit.apply(changes)
+        assert fakeDB.callCount() == fakeDB.tests.callCount("update") == 10
+
+
+def test_localSnapshotQueryBudget(tmp_path):
+    winDescriptions, tests = _catalog()
+    with patchMainDB(winDescriptions, tests) as fakeDB:
+        snapshot = LocalSnapshot(tmp_path / "snapshot.sqlite3")
+        snapshot.refresh()
+
+        # up to date: only the lastUpdateDate projection and the ordered list
+        fakeDB.resetCalls()
+        snapshot.refresh()
+        assert fakeDB.callCount() == 2
+        assert fakeDB.windescriptions.callCount() == 0
+        assert fakeDB.tests.callCount("getOrderedList") == 1
+        snapshot.close()
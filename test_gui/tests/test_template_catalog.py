@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import os
+from unittest import mock
+from zipfile import ZipFile
+from datetime import datetime, timedelta, timezone
+
+from PySide6 import QtCore
+
+from main.scripts.gui.test_gui import template_catalog
+from main.scripts.gui.test_gui.template_catalog import (
+    TEMPLATE_FORMAT,
+    TEMPLATE_STATUS,
+    TemplateCatalog,
+    TemplatePickerDialog,
+    scanTemplates,
+)
+
+CORE_XML = (
+    '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties"'
+    ' xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:title>{}</dc:title></cp:coreProperties>'
+)
+
+
+def _template(path, title: str = ""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with ZipFile(path, "w") as document:
+        document.writestr("docProps/core.xml", CORE_XML.format(title))
+
+
+def _tree(root):
+    _template(root / "report.docx", "Report")
+    _template(root / "debrief" / "debrief.pptx", "Debrief")
+    _template(root / "debrief" / "~$debrief.pptx")  # Office lock file
+    (root / "notes.txt").write_text("not a template")
+
+
+def test_scanTemplates(tmp_path):
+    _tree(tmp_path)
+    templates = scanTemplates(tmp_path, [tmp_path], {})
+
+    assert set(templates) == {"report.docx", "debrief/debrief.pptx"}
+    assert templates["report.docx"].title == "Report"
+    assert templates["debrief/debrief.pptx"].format == TEMPLATE_FORMAT.PPTX
+
+    # unchanged files are not opened again
+    with mock.patch.object(template_catalog, "readTitle") as mock_readTitle:
+        assert scanTemplates(tmp_path, [tmp_path], templates) == templates
+        mock_readTitle.assert_not_called()
+        os.utime(tmp_path / "report.docx", (0, 0))
+        scanTemplates(tmp_path, [tmp_path], templates)
+        mock_readTitle.assert_called_once()
+
+
+def test_templateCatalog(tmp_path, qtbot):
+    root = tmp_path / "root"
+    _tree(root)
+    (root / "archive" / "2019").mkdir(parents=True)
+    catalog = TemplateCatalog(cachePath=tmp_path / "templates.json")
+    assert catalog.status("report.docx") == TEMPLATE_STATUS.UNKNOWN
+    with qtbot.waitSignal(catalog.changed):
+        catalog.start(root)
+    # directories without templates are not watched
+    assert set(catalog._watcher.directories()) == {str(root), str(root / "debrief")}
+
+    assert [info.path for info in catalog.templates(TEMPLATE_FORMAT.WORD)] == ["report.docx"]
+    assert [info.path for info in catalog.search("DEBRIEF")] == ["debrief/debrief.pptx"]
+    assert catalog.status("report.docx") == TEMPLATE_STATUS.OK
+    assert catalog.status("gone.docx") == TEMPLATE_STATUS.MISSING
+    lastWeek = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=7)
+    assert catalog.status("report.docx", since=lastWeek) == TEMPLATE_STATUS.CHANGED
+
+    # only the changed directory is scanned again
+    (root / "debrief" / "debrief.pptx").unlink()
+    with qtbot.waitSignal(catalog.changed, timeout=5000):
+        catalog.on_directoryChanged(str(root / "debrief"))
+    assert catalog.status("debrief/debrief.pptx") == TEMPLATE_STATUS.MISSING
+    assert catalog.status("report.docx") == TEMPLATE_STATUS.OK
+    assert set(catalog._watcher.directories()) == {str(root)}
+
+    # a new sub directory is scanned with its parent, then watched
+    _template(root / "new" / "deep" / "added.docx")
+    with qtbot.waitSignal(catalog.changed, timeout=5000):
+        catalog.on_directoryChanged(str(root))
+    assert catalog.status("new/deep/added.docx") == TEMPLATE_STATUS.OK
+    assert set(catalog._watcher.directories()) == {str(root), str(root / "new"), str(root / "new" / "deep")}
+
+    # served from the cache on next start, before any scan
+    cachedCatalog = TemplateCatalog(cachePath=tmp_path / "templates.json")
+    with mock.patch.object(TemplateCatalog, "rescan"):
+        cachedCatalog.start(root)
+    assert [info.path for info in cachedCatalog.templates()] == ["new/deep/added.docx", "report.docx"]
+
+
+def test_templatePickerDialog(tmp_path, qtbot):
+    root = tmp_path / "root"
+    _tree(root)
+    catalog = TemplateCatalog(cachePath=tmp_path / "templates.json")
+    with qtbot.waitSignal(catalog.changed):
+        catalog.start(root)
+
+    dialog = TemplatePickerDialog(None, TEMPLATE_FORMAT.PPTX, "Choose Debrief Template", catalog=catalog)
+    qtbot.addWidget(dialog)
+    assert dialog.filterModel.rowCount() == 1
+    dialog.searchLE.setText("report")
+    assert dialog.filterModel.rowCount() == 0
+    dialog.searchLE.setText("DEBRIEF.")  # path
+    assert dialog.filterModel.rowCount() == 1
+    _template(root / "slides.pptx", "Weekly review")
+    with qtbot.waitSignal(catalog.changed, timeout=5000):
+        catalog.on_directoryChanged(str(root))
+    dialog.searchLE.setText("weekly")  # title
+    assert dialog.filterModel.rowCount() == 1
+    dialog.templateLV.setCurrentIndex(dialog.filterModel.index(0, 0))
+    dialog.accept()
+    assert dialog.selectedPath == root / "slides.pptx"
+    # no longer updated by the catalog once closed
+    assert catalog.receivers(QtCore.SIGNAL("changed()")) == 0
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import pytest
+from unittest import mock
+from datetime import datetime
+
+from main.lib.database import mainDB
+from main.scripts.gui.test_gui.test_cache import TestCache, SaveConflictError
+from main.scripts.gui.test_gui.local_snapshot import localSnapshot
+from fake_db import patchDB, patchMainDB
+from constants.versions import Version
+
+OBJECT_TYPES = mainDB.objects.OBJECT_TYPE_LIST
+
+
+def _patchTests():
+    _, tests = patchDB([], [("Test", OBJECT_TYPES[0], Version(1, 0), [])])
+    tests[0]["lastUpdateDate"] = datetime(2024, 1, 1)
+    return tests
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_testCacheHit(mock_tests_get):
+    tests = _patchTests()
+    mock_tests_get.return_value = tests
+    cache = TestCache()
+
+    testData = cache.get(tests[0]["_id"])
+    testData["name"] = "Modified"  # copies are handed out
+
+    assert cache.get(tests[0]["_id"])["name"] == "Test"
+    assert mock_tests_get.call_count == 1
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_testCacheRevalidate(mock_tests_get):
+    tests = _patchTests()
+    testId = tests[0]["_id"]
+    mock_tests_get.return_value = tests
+    cache = TestCache()
+    cache.get(testId)
+
+    # unchanged: only the cheap lastUpdateDate query is made
+    mock_tests_get.return_value = [{"_id": testId, "lastUpdateDate": tests[0]["lastUpdateDate"]}]
+    assert cache.get(testId, revalidate=True)["name"] == "Test"
+    assert mock_tests_get.call_count == 2
+    assert "projection" in mock_tests_get.call_args.kwargs
+
+    # changed by someone else: full document is fetched again
+    updatedTest = dict(tests[0], name="Renamed", lastUpdateDate=datetime(2024, 1, 2))
+    mock_tests_get.side_effect = [[{"_id": testId, "lastUpdateDate": updatedTest["lastUpdateDate"]}], [updatedTest]]
+    assert cache.get(testId, revalidate=True)["name"] == "Renamed"
+    assert mock_tests_get.call_count == 4
+
+
+@mock.patch("main.lib.database.mainDB.tests.update")
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_testCacheUpdateInvalidates(mock_tests_get, mock_tests_update):
+    tests = _patchTests()
+    mock_tests_get.return_value = tests
+    cache = TestCache(maxSize=1)
+    cache.get(tests[0]["_id"])
+
+    assert cache.update(tests[0]["_id"], {"name": "Renamed"}) == mock_tests_update.return_value
+    cache.get(tests[0]["_id"])
+    assert mock_tests_get.call_count == 2
+
+
+def test_testCacheSaveConflict():
+    _, tests = patchDB([], [("Test", OBJECT_TYPES[0], Version(1, 0), [])])
+    testId = tests[0]["_id"]
+    with patchMainDB([], tests) as fakeDB:
+        cache = TestCache()
+        testData = cache.get(testId)
+        otherData = cache.get(testId)
+
+        editedVersion = {"major": 1, "minor": 1}
+        stored = cache.saveChanges(testId, dict(testData, version=editedVersion), {"name": "Mine"})
+        assert stored["name"] == "Mine"
+        assert cache.get(testId)["version"] == Version(1, 1)
+        assert stored["lastUpdateDate"] == fakeDB.tests.documents[testId]["lastUpdateDate"]
+        # read before the first save
+        with pytest.raises(SaveConflictError):
+            cache.saveChanges(testId, otherData, {"comment": "Theirs"})
+        assert fakeDB.tests.documents[testId].get("comment") != "Theirs"
+
+        stored = cache.saveChanges(testId, otherData, {"comment": "Theirs"}, force=True)
+        assert stored["name"] == "Mine" and stored["comment"] == "Theirs"
+        fakeDB.resetCalls()
+        assert cache.get(testId) == stored and fakeDB.callCount() == 0
+
+
+@mock.patch("main.lib.database.mainDB.tests.get")
+def test_testCacheSnapshotFallback(mock_tests_get):
+    tests = _patchTests()
+    mock_tests_get.side_effect = ConnectionError("database not reachable")
+    cache = TestCache()
+
+    with mock.patch.object(localSnapshot, "enabled", True), mock.patch.object(
+        localSnapshot, "getDocument", return_value=tests[0]
+    ):
+        assert cache.get(tests[0]["_id"])["name"] == "Test"
+        assert cache.get(tests[0]["_id"], revalidate=True)["name"] == "Test"
+    assert mock_tests_get.call_count == 1  # revalidation attempted, the snapshot entry is kept
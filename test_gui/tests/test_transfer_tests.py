@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import io
+
+from bson import json_util
+
+from main.lib.database import mainDB
+from main.scripts.gui.test_gui.transfer_tests import exportTests, TestImporter
+from fake_db import patchDB, patchMainDB
+from utils import generateRandomCode
+from constants.versions import Version
+
+OBJECT_TYPES = mainDB.objects.OBJECT_TYPE_LIST
+
+
+def test_exportImportTests():
+    codes = generateRandomCode(10)
+    winDescriptions, tests = patchDB(codes, [
+        ("Test", OBJECT_TYPES[0], Version(1, 0), [0, 1, 2]),
+        ("Other", OBJECT_TYPES[0], Version(2, 1), [2, 3]),
+        ("Not Exported", OBJECT_TYPES[0], Version(1, 0), [9]),
+    ])
+    output = io.StringIO()
+    with patchMainDB(winDescriptions, tests) as sourceDB:
+        assert exportTests(output, ["Test", "Other"], batchSize=1) == 2
+        # each referenced win is written once, one query per batch
+        assert sourceDB.windescriptions.callCount("get") == 2
+        assert sourceDB.tests.callCount("get") == 3
+
+    records = [json_util.loads(line) for line in output.getvalue().splitlines()]
+    assert [record["collection"] for record in records] == ["windescriptions"] * 3 + ["tests"] + ["windescriptions", "tests"]
+
+    # the target already has the win 0 and the test Other 2.1, the file has Test 1.0 twice
+    lines = output.getvalue().splitlines()
+    lines.append(lines[3])
+    targetWins, targetTests = patchDB([codes[0]], [("Other", OBJECT_TYPES[0], Version(2, 1), [])])
+    with patchMainDB(targetWins, targetTests) as targetDB:
+        importer = TestImporter(batchSize=2)
+        created = importer.importRecords(lines)
+
+        # the win 3 is only used by the skipped test
+        assert created["tests"] == 1 and created["windescriptions"] == 2
+        assert importer.skipped == {"tests": 2, "windescriptions": 2, "stagedescriptions": 0, "scoredescriptions": 0}
+        assert len(mainDB.windescriptions.get()) == 3
+        test = mainDB.tests.get(name="Test")[0]
+        assert test["_id"] != tests[0]["_id"] and isinstance(test["version"], Version)
+        wins = {win["_id"]: tuple(win["outputPath"]) for win in mainDB.windescriptions.get()}
+        assert [wins[winId] for winId in test["winDescriptionIdList"]] == [tuple(code) for code in codes[:3]]
+        assert test["winDescriptionIdList"][0] == targetWins[0]["_id"]
+
+        targetDB.resetCalls()
+        TestImporter(dryRun=True).importRecords(output.getvalue().splitlines())
+        assert targetDB.tests.callCount("create") == 0
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from bson import ObjectId
+
+from main.scripts.gui.test_gui.usage_stats import UsageStats
+
+DAY = 24 * 3600
+
+
+def test_usageStatsFrecency(tmp_path):
+    stats = UsageStats(tmp_path / "usage.json")
+    assert stats.topTests(5) == []  # disabled
+    stats.enable()
+
+    oldId, recentId, savedId = ObjectId(), ObjectId(), ObjectId()
+    now = 1000 * DAY
+    # often used a long time ago
+    for day in range(5):
+        stats.record(oldId, "Old - 1.0", now=now - 60 * DAY + day)
+    stats.record(recentId, "Recent - 1.0", now=now - DAY)
+    stats.record(savedId, "Saved - 1.0", "save", now=now - DAY)
+
+    assert stats.topTests(5, now=now) == [("Saved - 1.0", savedId), ("Recent - 1.0", recentId), ("Old - 1.0", oldId)]
+    assert stats.topTests(1, now=now) == [("Saved - 1.0", savedId)]
+
+    # persisted
+    reloaded = UsageStats(tmp_path / "usage.json")
+    reloaded.enable()
+    assert reloaded.topTests(5, now=now) == stats.topTests(5, now=now)
+    reloaded.forget(oldId)
+    assert len(reloaded.topTests(5, now=now)) == 2
+
+
+def test_usageStatsBounded(tmp_path):
+    stats = UsageStats(tmp_path / "usage.json")
+    stats.enable()
+    stats.MAX_ENTRIES = 10
+    testIds = [ObjectId() for _ in range(20)]
+    for i, testId in enumerate(testIds):
+        stats.record(testId, f"Test{i} - 1.0", now=float(i))
+
+    # the least recently used are dropped
+    assert {testId for _, testId in stats.topTests(20, now=20.0)} == set(testIds[10:])
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from PySide6 import QtWidgets
+
+from main.scripts.gui.test_gui.widget_binding import BindingEngine
+
+
+def _widgets(qtbot):
+    lineEdit, textEdit, comboBox, spinBox, checkBox = (
+        QtWidgets.QLineEdit(),
+        QtWidgets.QTextEdit(),
+        QtWidgets.QComboBox(),
+        QtWidgets.QSpinBox(),
+        QtWidgets.QCheckBox(),
+    )
+    for widget in [lineEdit, textEdit, comboBox, spinBox, checkBox]:
+        qtbot.addWidget(widget)
+    for item in ["A", "B", "C"]:
+        comboBox.addItem(item, item)
+    return lineEdit, textEdit, comboBox, spinBox, checkBox
+
+
+def test_bindingEnginePushDoesNotEdit(qtbot):
+    lineEdit, textEdit, comboBox, spinBox, checkBox = _widgets(qtbot)
+    data = {"name": "Test", "comment": "Comment", "objectType": "B", "major": 2, "active": True}
+    edits = []
+    engine = BindingEngine(
+        {lineEdit: ["name"], textEdit: ["comment"], comboBox: ["objectType"], spinBox: ["major"], checkBox: ["active"]},
+        lambda mapKeyList, value: edits.append((mapKeyList, value)),
+    )
+
+    engine.push(lambda mapKeyList: data[mapKeyList[0]])
+
+    assert edits == []
+    assert lineEdit.text() == "Test"
+    assert textEdit.toPlainText() == "Comment"
+    assert comboBox.currentText() == "B"
+    assert spinBox.value() == 2
+    assert checkBox.isChecked() is True
+
+    # unchanged values are not pushed again
+    textEdit.textChanged.connect(lambda: edits.append("repaint"))
+    engine.push(lambda mapKeyList: data[mapKeyList[0]])
+    assert edits == []
+
+
+def test_bindingEngineDebouncedTextEdit(qtbot):
+    _, textEdit, comboBox, _, _ = _widgets(qtbot)
+    edits = []
+    engine = BindingEngine(
+        {textEdit: ["comment"], comboBox: ["objectType"]},
+        lambda mapKeyList, value: edits.append((mapKeyList, value)),
+    )
+
+    comboBox.setCurrentIndex(2)
+    assert edits == [(["objectType"], "C")]
+
+    for text in ["a", "ab", "abc"]:
+        textEdit.setPlainText(text)
+    qtbot.waitUntil(lambda: len(edits) == 2)
+    assert edits[-1] == (["comment"], "abc")
+
+    # pending edits are committed on flush, dropped on discard
+    textEdit.setPlainText("abcd")
+    engine.flush()
+    assert edits[-1] == (["comment"], "abcd")
+    textEdit.setPlainText("")
+    engine.discardPending()
+    qtbot.wait(2 * engine.bindings[0].debounceMs)
+    assert len(edits) == 3
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import pytest
+
+from main.scripts.gui.test_gui.workers import Worker
+
+
+def test_workerFinished(qtbot):
+    worker = Worker(lambda a, b=0: a + b, 1, b=2)
+    with qtbot.waitSignal(worker.signals.finished) as blocker:
+        worker.start()
+    assert blocker.args == [3]
+
+
+def test_workerFailed(qtbot):
+    def fail():
+        raise ValueError("failed")
+
+    worker = Worker(fail)
+    with qtbot.waitSignal(worker.signals.failed) as blocker:
+        worker.start()
+    with pytest.raises(ValueError):
+        raise blocker.args[0]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+from main.scripts.gui.test_gui.workspace_cache import TestWorkspace, WorkspaceCache, estimateSize
+
+
+def _workspace(nbTemplates: int = 0, dirty: bool = False) -> TestWorkspace:
+    testData = {"name": "Test", "reportFilePathList": [f"templates/report_{i}.docx" for i in range(nbTemplates)]}
+    return TestWorkspace(SimpleNamespace(testData=testData, isDirty=lambda: dirty), editing=dirty, tabIndex=0)
+
+
+def test_workspaceCacheLru():
+    cache = WorkspaceCache(maxEntries=2)
+    testIds = [ObjectId() for _ in range(3)]
+    for testId in testIds:
+        cache.put(testId, _workspace())
+
+    assert testIds[0] not in cache and len(cache) == 2
+    workspace = cache.pop(testIds[1])
+    assert workspace is not None and testIds[1] not in cache
+    cache.put(testIds[1], workspace)
+    cache.put(testIds[0], _workspace())
+    # testIds[2] was the least recently stashed
+    assert testIds[2] not in cache and testIds[1] in cache
+
+
+def test_workspaceCacheMemoryBudget():
+    small, large = _workspace(), _workspace(1000)
+    assert large.size > estimateSize(large.testModel.testData["reportFilePathList"])
+    cache = WorkspaceCache(maxEntries=10, memoryBudget=large.size + small.size)
+    smallId, largeId, otherId = ObjectId(), ObjectId(), ObjectId()
+    cache.put(smallId, small)
+    cache.put(largeId, large)
+    assert len(cache) == 2
+
+    cache.put(otherId, _workspace())
+    assert smallId not in cache and largeId in cache
+    assert cache.totalSize == large.size + cache._workspaces[otherId].size
+
+    # the last stashed workspace is kept even when over budget
+    cache.put(ObjectId(), _workspace(5000))
+    assert len(cache) == 1
+
+
+def test_workspaceCacheKeepsDirtyWorkspaces():
+    cache = WorkspaceCache(maxEntries=2)
+    dirtyId, cleanId, otherId, lastId = ObjectId(), ObjectId(), ObjectId(), ObjectId()
+    cache.put(dirtyId, _workspace(dirty=True))
+    cache.put(cleanId, _workspace())
+    cache.put(otherId, _workspace())
+    # the least recent clean workspace is evicted instead
+    assert dirtyId in cache and cleanId not in cache and len(cache) == 2
+
+    cache.put(lastId, _workspace(dirty=True))
+    assert otherId not in cache and len(cache) == 2
+    # only unsaved edits left, kept over the bounds
+    cache.put(ObjectId(), _workspace())
+    assert dirtyId in cache and lastId in cache and len(cache) == 3
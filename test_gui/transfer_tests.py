@@ -0,0 +1,249 @@
+"""Export tests with the descriptions they reference to newline delimited JSON, and import them back.
+
+    python transfer_tests.py export catalog.ndjson [--test NAME ...]
+    python transfer_tests.py import catalog.ndjson [--dry-run]
+
+Each line is {"collection": ..., "document": ...} in MongoDB extended JSON (bson.json_util),
+descriptions are written before the first test referencing them. Tests are streamed by batches,
+so memory only holds one batch and the ids already exported, each batch costing one query per
+collection.
+"""
+
+from __future__ import annotations
+
+import sys
+import logging
+import argparse
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Iterable, Iterator
+
+from bson import ObjectId, json_util
+
+from main.lib.database import mainDB
+
+from constants.versions import Version
+
+# test key -> collection of the referenced descriptions
+REFERENCE_LISTS = {
+    "winDescriptionIdList": "windescriptions",
+    "stageDescriptionIdList": "stagedescriptions",
+    "scoreDescriptionIdList": "scoredescriptions",
+}
+# keys handled by the database itself, see TestModel.READ_ONLY_KEYS
+READ_ONLY_KEYS = ["_id", "lastUpdateDate", "creationDate", "lastUpdateUser"]
+BATCH_SIZE = 200
+NB_WORKERS = 8
+
+
+def _batches(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _collection(name: str) -> Any:
+    collection = getattr(mainDB, name, None)
+    if collection is None:
+        raise RuntimeError(f"mainDB has no {name} collection")
+    return collection
+
+
+def _getByIds(collection: Any, documentIds: list[ObjectId]) -> list[dict]:
+    """Documents of documentIds in that order, in a single query."""
+    documents = {document["_id"]: document for document in collection.get(_id={"$in": documentIds})}
+    if missing := [documentId for documentId in documentIds if documentId not in documents]:
+        logging.warning(f"{len(missing)} documents not found, not exported: {missing}")
+    return [documents[documentId] for documentId in documentIds if documentId in documents]
+
+
+def _version(value: Any) -> Version:
+    return value if isinstance(value, Version) else Version(value)
+
+
+def _writeRecord(output: IO[str], collection: str, document: dict):
+    if isinstance(document.get("version"), Version):
+        document = dict(document, version=document["version"].toDict())
+    output.write(json_util.dumps({"collection": collection, "document": document}) + "\n")
+
+
+# ------------------------------ EXPORT ------------------------------ #
+
+
+def exportTests(output: IO[str], testNames: list[str] = None, batchSize: int = BATCH_SIZE) -> int:
+    """Write the tests (all of them when testNames is empty) and their descriptions, return the number of tests."""
+    testIds = [
+        test["_id"]
+        for test in mainDB.tests.get(projection={"name": True})
+        if not testNames or test["name"] in testNames
+    ]
+    exported: dict[str, set[ObjectId]] = {collection: set() for collection in REFERENCE_LISTS.values()}
+    nbTests = 0
+    for batch in _batches(testIds, batchSize):
+        tests = _getByIds(mainDB.tests, batch)
+        for key, collectionName in REFERENCE_LISTS.items():
+            missingIds = list(dict.fromkeys(
+                documentId
+                for test in tests
+                for documentId in test.get(key) or []
+                if documentId not in exported[collectionName]
+            ))
+            if not missingIds:
+                continue
+            for document in _getByIds(_collection(collectionName), missingIds):
+                _writeRecord(output, collectionName, document)
+            exported[collectionName].update(missingIds)
+        for test in tests:
+            _writeRecord(output, "tests", test)
+        nbTests += len(tests)
+        logging.info(f"{nbTests}/{len(testIds)} tests exported")
+    return nbTests
+
+
+# ------------------------------ IMPORT ------------------------------ #
+
+
+class TestImporter:
+    """Create the records of an export in the current database.
+
+    Descriptions get new ids, the test reference lists are remapped accordingly. Win
+    descriptions with an outputPath already in the database and tests with an existing
+    name and version (in the database or earlier in the file) are not created again.
+
+    Descriptions are held until a test to create references them, those only referenced
+    by skipped tests are never created. Tests are created by batches, the descriptions
+    they reference first.
+    """
+
+    def __init__(self, dryRun: bool = False, batchSize: int = BATCH_SIZE, nbWorkers: int = NB_WORKERS) -> None:
+        self.dryRun = dryRun
+        self.batchSize = batchSize
+        self.nbWorkers = nbWorkers
+        # collection -> exported _id -> _id in this database
+        self.idMap: dict[str, dict[ObjectId, ObjectId]] = {collection: {} for collection in REFERENCE_LISTS.values()}
+        self.created: dict[str, int] = {"tests": 0, **{collection: 0 for collection in REFERENCE_LISTS.values()}}
+        self.skipped: dict[str, int] = dict.fromkeys(self.created, 0)
+        # collection -> exported _id -> description not created yet
+        self._descriptions: dict[str, dict[ObjectId, dict]] = {collection: {} for collection in REFERENCE_LISTS.values()}
+        self._pendingTests: list[dict] = []
+        self._existingWins = {
+            tuple(win["outputPath"]): win["_id"] for win in mainDB.windescriptions.get(projection={"outputPath": True})
+        }
+        self._existingTests = {
+            (test["name"], str(_version(test["version"])))
+            for test in mainDB.tests.get(projection={"name": True, "version": True})
+        }
+
+    def _create(self, collectionName: str, document: dict) -> ObjectId:
+        if self.dryRun:
+            return ObjectId()
+        kwargs = {key: value for key, value in document.items() if key not in READ_ONLY_KEYS}
+        return _collection(collectionName).create(**kwargs)
+
+    def _createAll(self, collectionName: str, documents: list[dict], pool: ThreadPoolExecutor) -> list[ObjectId]:
+        newIds = list(pool.map(lambda document: self._create(collectionName, document), documents))
+        self.created[collectionName] += len(documents)
+        return newIds
+
+    def _flushTests(self, pool: ThreadPoolExecutor):
+        tests, self._pendingTests = self._pendingTests, []
+        if not tests:
+            return
+        # descriptions first, tests reference them
+        for key, collectionName in REFERENCE_LISTS.items():
+            idMap = self.idMap[collectionName]
+            descriptions = self._descriptions[collectionName]
+            referencedIds = dict.fromkeys(documentId for test in tests for documentId in test.get(key) or [])
+            documents = [
+                descriptions.pop(documentId)
+                for documentId in referencedIds
+                if documentId not in idMap and documentId in descriptions
+            ]
+            for document, newId in zip(documents, self._createAll(collectionName, documents, pool)):
+                idMap[document["_id"]] = newId
+        for test in tests:
+            for key, collectionName in REFERENCE_LISTS.items():
+                if test.get(key):
+                    idMap = self.idMap[collectionName]
+                    missing = [documentId for documentId in test[key] if documentId not in idMap]
+                    if missing:
+                        logging.warning(f"Test {test['name']}: {len(missing)} {collectionName} not in export, dropped")
+                    test[key] = [idMap[documentId] for documentId in test[key] if documentId in idMap]
+        self._createAll("tests", tests, pool)
+
+    def _addDescription(self, collectionName: str, document: dict):
+        existingId = self._existingWins.get(tuple(document["outputPath"])) if collectionName == "windescriptions" else None
+        if existingId is not None:
+            self.idMap[collectionName][document["_id"]] = existingId
+            self.skipped[collectionName] += 1
+            return
+        self._descriptions[collectionName][document["_id"]] = document
+
+    def _addTest(self, test: dict, pool: ThreadPoolExecutor):
+        test["version"] = _version(test["version"])
+        testKey = (test["name"], str(test["version"]))
+        if testKey in self._existingTests:
+            logging.warning(f"Test {test['name']} - {test['version']} already exists, skipped")
+            self.skipped["tests"] += 1
+            return
+        # a later record with the same name and version is a duplicate
+        self._existingTests.add(testKey)
+        self._pendingTests.append(test)
+        if len(self._pendingTests) >= self.batchSize:
+            self._flushTests(pool)
+
+    def importRecords(self, lines: Iterable[str]) -> dict[str, int]:
+        """Create the records of the lines, return the number of created documents per collection."""
+        with ThreadPoolExecutor(max_workers=self.nbWorkers) as pool:
+            for lineNumber, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                record = json_util.loads(line)
+                match record["collection"]:
+                    case "tests":
+                        self._addTest(record["document"], pool)
+                    case collectionName if collectionName in self.idMap:
+                        self._addDescription(collectionName, record["document"])
+                    case collectionName:
+                        raise ValueError(f"Line {lineNumber}: unknown collection {collectionName}")
+            self._flushTests(pool)
+        # only referenced by skipped tests
+        for collectionName, descriptions in self._descriptions.items():
+            self.skipped[collectionName] += len(descriptions)
+            descriptions.clear()
+        return self.created
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    exportParser = subparsers.add_parser("export", help="write tests and their descriptions to a file")
+    exportParser.add_argument("path")
+    exportParser.add_argument("--test", action="append", default=[], help="test name, all tests when omitted")
+    importParser = subparsers.add_parser("import", help="create the tests of an export file")
+    importParser.add_argument("path")
+    importParser.add_argument("--dry-run", action="store_true", help="only report what would be created")
+    importParser.add_argument("--workers", type=int, default=NB_WORKERS)
+    for subparser in [exportParser, importParser]:
+        subparser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    match args.command:
+        case "export":
+            with open(args.path, "w", encoding="utf-8") as output:
+                nbTests = exportTests(output, args.test, args.batch_size)
+            logging.info(f"{nbTests} tests exported to {args.path}")
+        case "import":
+            if mainDB.IS_READ_ONLY and not args.dry_run:
+                logging.error("Database is read only")
+                return 1
+            importer = TestImporter(args.dry_run, args.batch_size, args.workers)
+            with open(args.path, encoding="utf-8") as lines:
+                created = importer.importRecords(lines)
+            logging.info(f"Created: {created}, already existing: {importer.skipped}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
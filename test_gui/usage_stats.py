@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import json
+import logging
+from time import time
+from pathlib import Path
+from typing import Optional
+
+from bson import ObjectId
+
+DEFAULT_USAGE_STATS_PATH = Path.home() / ".test_gui" / "usage.json"
+
+
+class UsageStats:
+    """Per user frecency of the tests, stored in a small local JSON file.
+
+    Each open/save adds its weight to the test score, scores decay by half every HALF_LIFE
+    seconds so recent use counts more than old use. Only the MAX_ENTRIES best tests are kept.
+    Nothing is read nor recorded until enabled.
+    """
+
+    HALF_LIFE = 14 * 24 * 3600
+    MAX_ENTRIES = 200
+    WEIGHTS = {"open": 1.0, "save": 2.0}
+
+    def __init__(self, path: Path = DEFAULT_USAGE_STATS_PATH) -> None:
+        self.path = Path(path)
+        self.enabled = False
+        # test _id (hex) -> [label, score, last use timestamp], loaded on first use
+        self._entries: Optional[dict[str, list]] = None
+
+    def enable(self):
+        self.enabled = True
+
+    def _load(self) -> dict[str, list]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text())
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError) as e:
+                logging.warning(f"Usage statistics not readable, starting over: {e}")
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # written aside then renamed, an interrupted write never leaves a truncated file
+            tmpPath = self.path.with_suffix(".tmp")
+            tmpPath.write_text(json.dumps(self._entries, separators=(",", ":")))
+            os.replace(tmpPath, self.path)
+        except OSError as e:
+            logging.warning(f"Usage statistics not saved: {e}")
+
+    def _decayedScore(self, entry: list, now: float) -> float:
+        _, score, lastUse = entry
+        return score * 0.5 ** ((now - lastUse) / self.HALF_LIFE)
+
+    def record(self, testId: ObjectId, label: str, event: str = "open", now: Optional[float] = None):
+        if not self.enabled:
+            return
+        now = time() if now is None else now
+        entries = self._load()
+        entry = entries.get(str(testId))
+        score = self._decayedScore(entry, now) if entry is not None else 0.0
+        entries[str(testId)] = [label, score + self.WEIGHTS[event], now]
+        if len(entries) > self.MAX_ENTRIES:
+            kept = sorted(entries.items(), key=lambda item: self._decayedScore(item[1], now), reverse=True)
+            self._entries = dict(kept[: self.MAX_ENTRIES])
+        self._save()
+
+    def forget(self, testId: ObjectId):
+        if self.enabled and self._load().pop(str(testId), None) is not None:
+            self._save()
+
+    def topTests(self, count: int, now: Optional[float] = None) -> list[tuple[str, ObjectId]]:
+        """The count most used tests as (label, _id), best first."""
+        if not self.enabled:
+            return []
+        now = time() if now is None else now
+        ranked = sorted(self._load().items(), key=lambda item: self._decayedScore(item[1], now), reverse=True)
+        return [(label, ObjectId(testId)) for testId, (label, _, _) in ranked[:count]]
+
+
+usageStats = UsageStats()
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+from PySide6 import QtWidgets, QtCore
+
+from main.lib.misc import utils
+
+
+class WidgetBinding:
+    """Two way binding between a widget and a test data mapList.
+
+    Getter, setter and change signal are resolved once from the widget type. Model to view
+    updates are done with the widget signals blocked and only when the value differs from what
+    the widget shows. View to model edits can be debounced (debounceMs > 0).
+    """
+
+    def __init__(
+        self,
+        widget: QtWidgets.QWidget,
+        mapKeyList: list[str],
+        getter: Callable[[], Any],
+        setter: Callable[[Any], None],
+        signal: Optional[QtCore.SignalInstance] = None,
+        debounceMs: int = 0,
+    ) -> None:
+        self.widget = widget
+        self.mapKeyList = mapKeyList
+        self.getter = getter
+        self.setter = setter
+        self.signal = signal
+        self.debounceMs = debounceMs
+        self._timer: QtCore.QTimer = None
+        self._onEdit: Callable[[list[str], Any], None] = None
+
+    def connect(self, onEdit: Callable[[list[str], Any], None]):
+        """Call onEdit(mapKeyList, value) on user edits."""
+        if self.signal is None:
+            return
+        self._onEdit = onEdit
+        if self.debounceMs > 0:
+            self._timer = QtCore.QTimer(self.widget)
+            self._timer.setSingleShot(True)
+            self._timer.setInterval(self.debounceMs)
+            self._timer.timeout.connect(self.commit)
+            self.signal.connect(self._timer.start)
+        else:
+            self.signal.connect(self.commit)
+
+    def commit(self):
+        if self._timer is not None:
+            self._timer.stop()
+        self._onEdit(self.mapKeyList, self.getter())
+
+    def isPending(self) -> bool:
+        return self._timer is not None and self._timer.isActive()
+
+    def discard(self):
+        if self._timer is not None:
+            self._timer.stop()
+
+    def push(self, value: Any):
+        if self.getter() == value:
+            return
+        if self.signal is None:
+            self.setter(value)
+            return
+        wasBlocked = self.widget.blockSignals(True)
+        try:
+            self.setter(value)
+        finally:
+            self.widget.blockSignals(wasBlocked)
+
+
+class _ComboIndex:
+    """itemText -> index lookup of a combo box, rebuilt when its items count changes."""
+
+    def __init__(self, widget: QtWidgets.QComboBox) -> None:
+        self.widget = widget
+        self._indexes: dict[str, int] = {}
+
+    def setValue(self, value: Any):
+        if len(self._indexes) != self.widget.count():
+            self._indexes = {self.widget.itemText(index): index for index in range(self.widget.count())}
+        if (index := self._indexes.get(value)) is not None:  # findData method not working...
+            self.widget.setCurrentIndex(index)
+
+
+def _listWidgetItems(widget: QtWidgets.QListWidget) -> list[str]:
+    return [widget.item(row).text() for row in range(widget.count())]
+
+
+def _setListWidgetItems(widget: QtWidgets.QListWidget, value: Optional[list[str]]):
+    widget.clear()
+    if value:
+        widget.addItems(value)
+
+
+def _setSpinBoxValue(widget: QtWidgets.QSpinBox, value: Optional[int]):
+    if value is not None:
+        widget.setValue(value)
+
+
+def _textOrNone(text: str) -> Optional[str]:
+    return text if text != "" else None
+
+
+def createBinding(widget: QtWidgets.QWidget, mapKeyList: list[str], textDebounceMs: int = 300) -> WidgetBinding:
+    match widget:
+        case QtWidgets.QLineEdit():
+            return WidgetBinding(
+                widget, mapKeyList,
+                getter=lambda: utils.removeWhitespace(widget.text()),
+                setter=lambda value: widget.setText(value if value is not None else ""),
+                signal=widget.editingFinished,
+            )
+        case QtWidgets.QComboBox():
+            return WidgetBinding(
+                widget, mapKeyList,
+                getter=widget.currentData,
+                setter=_ComboIndex(widget).setValue,
+                signal=widget.currentTextChanged,
+            )
+        case QtWidgets.QSpinBox():
+            return WidgetBinding(
+                widget, mapKeyList,
+                getter=widget.value,
+                setter=lambda value: _setSpinBoxValue(widget, value),
+                signal=widget.valueChanged,
+            )
+        case QtWidgets.QTextEdit():
+            # textChanged fires on each keystroke, edits are debounced
+            return WidgetBinding(
+                widget, mapKeyList,
+                getter=lambda: _textOrNone(widget.toPlainText()),
+                setter=lambda value: widget.setText(value if value is not None else ""),
+                signal=widget.textChanged,
+                debounceMs=textDebounceMs,
+            )
+        case QtWidgets.QListWidget():
+            # No signal for data changes, will be handle manually with buttons
+            return WidgetBinding(
+                widget, mapKeyList,
+                getter=lambda: _listWidgetItems(widget) or None,
+                setter=lambda value: _setListWidgetItems(widget, value),
+            )
+        case QtWidgets.QCheckBox():
+            return WidgetBinding(
+                widget, mapKeyList,
+                getter=widget.isChecked,
+                setter=lambda value: widget.setChecked(bool(value)),
+                signal=widget.stateChanged,
+            )
+        case _:
+            raise NotImplementedError
+
+
+class BindingEngine:
+    """Bindings of a {widget: mapKeyList} mapping, built once."""
+
+    def __init__(
+        self, mapping: dict[QtWidgets.QWidget, list[str]], onEdit: Callable[[list[str], Any], None]
+    ) -> None:
+        self.bindings = [createBinding(widget, mapKeyList) for widget, mapKeyList in mapping.items()]
+        for binding in self.bindings:
+            binding.connect(onEdit)
+
+    def push(self, getData: Callable[[list[str]], Any]):
+        """Update widgets from getData(mapKeyList), pending edits are committed first."""
+        self.flush()
+        for binding in self.bindings:
+            binding.push(getData(binding.mapKeyList))
+
+    def flush(self):
+        for binding in self.bindings:
+            if binding.isPending():
+                binding.commit()
+
+    def discardPending(self):
+        for binding in self.bindings:
+            binding.discard()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+from PySide6 import QtCore
+
+from main.scripts.gui.test_gui.db_instrumentation import dbInstrumentation
+
+
+class WorkerSignals(QtCore.QObject):
+    finished = QtCore.Signal(object)
+    failed = QtCore.Signal(object)
+
+
+class Worker(QtCore.QRunnable):
+    """Run fn(*args, **kwargs) out of the GUI thread, reporting its result or exception through signals.
+
+    QRunnable is not a QObject, signals are carried by a helper living in the GUI thread so that
+    connected slots are called there. Database calls are attributed to the action in progress
+    when the worker was created.
+    """
+
+    def __init__(self, fn: Callable[..., Any], *args, **kwargs) -> None:
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.action = dbInstrumentation.currentAction()
+
+    def run(self):
+        try:
+            with dbInstrumentation.attach(self.action):
+                result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+    def start(self, threadPool: QtCore.QThreadPool = None) -> Worker:
+        (threadPool or QtCore.QThreadPool.globalInstance()).start(self)
+        return self
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict
+from typing import Any, Optional
+
+from bson import ObjectId
+
+WORKSPACE_MEMORY_BUDGET = 64 * 2**20
+
+
+def estimateSize(value: Any) -> int:
+    """Approximate memory footprint in bytes of a document made of dicts, lists and scalars."""
+    size = sys.getsizeof(value)
+    match value:
+        case dict():
+            size += sum(estimateSize(key) + estimateSize(item) for key, item in value.items())
+        case list() | tuple() | set():
+            size += sum(estimateSize(item) for item in value)
+    return size
+
+
+class TestWorkspace:
+    """Per test state of a TestWindow kept while another test is shown."""
+
+    __slots__ = ("testModel", "editing", "tabIndex", "size")
+
+    def __init__(self, testModel: Any, editing: bool, tabIndex: int) -> None:
+        self.testModel = testModel
+        self.editing = editing
+        self.tabIndex = tabIndex
+        self.size = estimateSize(testModel.testData)
+
+
+class WorkspaceCache:
+    """Bounded LRU of the test workspaces, by count and estimated memory.
+
+    Workspaces with unsaved edits are never evicted, the cache goes over its bounds instead.
+    """
+
+    def __init__(self, maxEntries: int = 5, memoryBudget: int = WORKSPACE_MEMORY_BUDGET) -> None:
+        self.maxEntries = maxEntries
+        self.memoryBudget = memoryBudget
+        self._workspaces: OrderedDict[ObjectId, TestWorkspace] = OrderedDict()
+        self.totalSize = 0
+
+    def __len__(self) -> int:
+        return len(self._workspaces)
+
+    def __contains__(self, testId: ObjectId) -> bool:
+        return testId in self._workspaces
+
+    def put(self, testId: ObjectId, workspace: TestWorkspace):
+        self.pop(testId)
+        self._workspaces[testId] = workspace
+        self.totalSize += workspace.size
+        while len(self._workspaces) > self.maxEntries or self.totalSize > self.memoryBudget:
+            if (evictedId := self._evictable()) is None:
+                break
+            self.pop(evictedId)
+
+    def _evictable(self) -> Optional[ObjectId]:
+        """Least recently stashed workspace without unsaved edits, never the most recent one."""
+        testIds = list(self._workspaces)[:-1]
+        return next((testId for testId in testIds if not self._workspaces[testId].testModel.isDirty()), None)
+
+    def pop(self, testId: ObjectId) -> Optional[TestWorkspace]:
+        workspace = self._workspaces.pop(testId, None)
+        if workspace is not None:
+            self.totalSize -= workspace.size
+        return workspace
+
+    def clear(self):
+        self._workspaces.clear()
+        self.totalSize = 0